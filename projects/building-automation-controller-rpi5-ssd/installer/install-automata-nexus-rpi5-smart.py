@@ -6,16 +6,454 @@ Handles both existing SSD setups and new SSD installations
 
 import os
 import sys
+
+# Checked before anything heavy (Tk in particular) is imported
+if __name__ == "__main__" and os.geteuid() != 0:
+    print("This installer must be run with sudo")
+    sys.exit(1)
+
 import subprocess
 import time
 import shutil
-import json
+import re
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime
 import threading
-from PIL import Image, ImageTk
+import shlex
+import functools
+import selectors
+import queue
+import errno
+import fcntl
+import tempfile
+from collections import deque
+from concurrent.futures import (ThreadPoolExecutor, as_completed, wait,
+                                ALL_COMPLETED, FIRST_EXCEPTION)
+
+# Largest chunk handed to the kernel per copy call, and the buffer size for
+# the plain read/write fallback
+COPY_RANGE_CHUNK = 1 << 30
+COPY_BUFFER_SIZE = 1 << 20
+
+# Pipe buffer for the tar | tar OS migration and dd | pigz backup
+F_SETPIPE_SZ = getattr(fcntl, 'F_SETPIPE_SZ', 1031)
+MIGRATE_PIPE_SIZE = 1 << 20
+
+# Coalescing of streamed command output into the log
+LOG_INTERVAL = 0.2  # seconds
+LOG_TAIL_LINES = 5
+POLL_INTERVAL = 0.1  # seconds
+HEARTBEAT_INTERVAL = 15  # seconds
+
+# CPU-heavy build tools, run at a lower priority away from the GUI's core
+BUILD_COMMANDS = {"cargo", "npm", "make", "gcc", "pip", "pip3"}
+BUILD_NICE = 10
+
+# Command output kept in memory before spilling to a temp file
+CAPTURE_SPOOL_SIZE = 64 * 1024
+ERROR_TAIL_BYTES = 4096
+
+# Concurrent file copies when staging the application, and how often to
+# report progress (in files)
+COPY_WORKERS = 8
+COPY_PROGRESS_EVERY = 500
+
+# How often the Tk main loop applies log lines and GUI calls queued by the
+# installation thread
+UI_POLL_MS = 100
+
+# Lines kept in the log widget; older ones are dropped from the top. The
+# complete log is appended to INSTALL_LOG
+LOG_MAX_LINES = 5000
+INSTALL_LOG = "/var/log/automata-nexus-install.log"
+
+# Header logo, shipped pre-scaled so startup doesn't resample it
+LOGO_SIZE = (250, 80)
+LOGO_FILE = "automata-nexus-logo-250x80.png"
+
+
+_ROOT_RE = re.compile(r'root=\S+')
+_OCTAL_ESCAPE_RE = re.compile(r'\\([0-7]{3})')
+
+
+def _fastcopy(src, dst):
+    """Copy a file, keeping the data inside the kernel where possible
+
+    Tries copy_file_range (server-side copy, reflinks on CoW filesystems),
+    then sendfile, then a read loop into one reused 1 MiB buffer. Each
+    fallback continues from the current file offsets.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while os.copy_file_range(src_fd, dst_fd, COPY_RANGE_CHUNK):
+                    pass
+                return
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                    
+        try:
+            while os.sendfile(dst_fd, src_fd, None, COPY_BUFFER_SIZE):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EINVAL):
+                raise
+                
+        buf = bytearray(COPY_BUFFER_SIZE)
+        view = memoryview(buf)
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            fdst.write(view[:n])
+
+
+def _big_pipe():
+    """Create a pipe with a MIGRATE_PIPE_SIZE buffer for chaining two commands
+
+    Sized before either command starts, so every write lands in the larger
+    buffer and the two sides wake each other ~16x less often than with the
+    default 64 KiB.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        fcntl.fcntl(write_fd, F_SETPIPE_SZ, MIGRATE_PIPE_SIZE)
+    except OSError:
+        pass
+    return read_fd, write_fd
+
+
+def _copy_link(src, dst):
+    """Recreate a symlink at dst, replacing whatever is there"""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    os.symlink(os.readlink(src), dst)
+
+
+def _copy_file(src, dst):
+    """Copy one regular file's data, mode and timestamps"""
+    _fastcopy(src, dst)
+    shutil.copystat(src, dst)
+
+
+@functools.lru_cache(maxsize=None)
+def _which(name):
+    """Absolute path of a command, looked up in $PATH once per name"""
+    return shutil.which(name) or name
+
+
+def _resolve(argv):
+    """argv with the program replaced by its memoized absolute path"""
+    return [_which(argv[0]), *argv[1:]]
+
+
+def _deprioritize(pid):
+    """Renice a build and keep it off CPU 0 so the GUI stays responsive
+
+    Applied right after the spawn instead of through preexec_fn, which would
+    take subprocess off its vfork fast path. Processes the build starts
+    later inherit both settings.
+    """
+    try:
+        os.setpriority(os.PRIO_PROCESS, pid, BUILD_NICE)
+        cpus = os.sched_getaffinity(0) - {0}
+        if cpus:
+            os.sched_setaffinity(pid, cpus)
+    except OSError:
+        pass
+
+
+def _read_spool(spool, tail=None):
+    """Decode what was written to a capture file, or only its last tail bytes"""
+    if tail is None:
+        spool.seek(0)
+    else:
+        spool.seek(max(0, spool.seek(0, os.SEEK_END) - tail))
+    return spool.read().decode(errors='replace')
+
+
+class CommandError(RuntimeError):
+    """A command exited non-zero
+
+    Carries only the last ERROR_TAIL_BYTES of its error output, so a failed
+    apt or cargo run doesn't drag megabytes of text through the handlers.
+    """
+    
+    def __init__(self, cmd, returncode, tail):
+        super().__init__(f"Command failed ({os.path.basename(cmd[0])} exited {returncode}): {tail}")
+        self.cmd = cmd
+        self.returncode = returncode
+        self.tail = tail
+
+
+def _mkdir(path):
+    """Create a directory whose parent is known to exist
+
+    A single mkdir call, where os.makedirs(exist_ok=True) first stats its
+    way up the path.
+    """
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+
+
+def _copy_tree(src_root, dst_root, workers=COPY_WORKERS, progress=None):
+    """Copy a directory tree with _fastcopy, preserving symlinks
+
+    Directories and links are created in a single walk, then the file copies
+    are spread over a thread pool since each one mostly waits on the disk.
+    progress(done, total) is called from the calling thread as files finish.
+    """
+    files = []
+    os.makedirs(dst_root, exist_ok=True)
+    for dirpath, dirnames, filenames in os.walk(src_root):
+        dst_dir = os.path.join(dst_root, os.path.relpath(dirpath, src_root))
+        # Top-down walk: the parent was created on an earlier iteration
+        _mkdir(dst_dir)
+        
+        # os.walk lists symlinked directories but doesn't descend into them
+        for name in list(dirnames):
+            src = os.path.join(dirpath, name)
+            if os.path.islink(src):
+                dirnames.remove(name)
+                _copy_link(src, os.path.join(dst_dir, name))
+                
+        for name in filenames:
+            src = os.path.join(dirpath, name)
+            dst = os.path.join(dst_dir, name)
+            if os.path.islink(src):
+                _copy_link(src, dst)
+            else:
+                files.append((src, dst))
+                
+    total = len(files)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_copy_file, src, dst) for src, dst in files]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            if progress and (done % COPY_PROGRESS_EVERY == 0 or done == total):
+                progress(done, total)
+
+
+def _mounts():
+    """Map 'major:minor' of each mounted block device to its first mount point"""
+    mounts = {}
+    with open('/proc/self/mountinfo') as f:
+        for line in f:
+            fields = line.split()
+            # Mount points escape whitespace as octal, e.g. \040
+            mount_point = _OCTAL_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 8)), fields[4])
+            mounts.setdefault(fields[2], mount_point)
+    return mounts
+
+
+def _partitions(device):
+    """Return (name, 'major:minor') for each partition of a disk, from sysfs"""
+    disk = os.path.basename(device)
+    sys_dir = f"/sys/block/{disk}"
+    parts = []
+    for name in sorted(os.listdir(sys_dir)):
+        if name.startswith(disk) and os.path.exists(f"{sys_dir}/{name}/partition"):
+            with open(f"{sys_dir}/{name}/dev") as f:
+                parts.append((name, f.read().strip()))
+    return parts
+
+
+def _disk_numbers(device):
+    """Return the 'major:minor' of a disk and of each of its partitions"""
+    rdev = os.stat(device).st_rdev
+    return {f"{os.major(rdev)}:{os.minor(rdev)}"} | {dev for _, dev in _partitions(device)}
+
+
+def _backup_dest_error(dest, ssd_device):
+    """Explain why dest can't hold the SD backup, or return None if it can
+
+    The image must land on a third disk: not the SD card being copied and not
+    the SSD that is about to be wiped.
+    """
+    if not dest:
+        return "Choose a directory to store the SD card backup in."
+    if not os.path.isdir(dest):
+        return f"Backup directory {dest} does not exist."
+    dev = os.stat(dest).st_dev
+    dest_dev = f"{os.major(dev)}:{os.minor(dev)}"
+    for device, what in ((ssd_device, "the SSD that will be formatted"), (SD_DEVICE, "the SD card being backed up")):
+        if device and os.path.exists(device) and dest_dev in _disk_numbers(device):
+            return f"Backup directory {dest} is on {what}; choose a directory on another drive."
+    return None
+
+
+def _human_size(n):
+    """Format a byte count the way df -h does"""
+    for unit in 'KMGTP':
+        n /= 1024
+        if n < 1024 or unit == 'P':
+            return f"{n:.1f}{unit}" if n < 10 else f"{n:.0f}{unit}"
+
+
+def _uuid_for_dev(dev):
+    """Look up a filesystem UUID by device number in /dev/disk/by-uuid"""
+    by_uuid = '/dev/disk/by-uuid'
+    for uuid in os.listdir(by_uuid):
+        try:
+            if os.stat(os.path.join(by_uuid, uuid)).st_rdev == dev:
+                return uuid
+        except OSError:
+            continue
+    return ''
+
+
+def _scaled_logo(src):
+    """Resize the full logo to LOGO_SIZE once and return the cached copy
+
+    The cache file lives in the user's (root's) own cache directory, not
+    world-writable /tmp, and is keyed by the source mtime and size so an
+    updated logo is picked up; returns None when there is no logo at all.
+    """
+    if not os.path.exists(src):
+        return None
+    st = os.stat(src)
+    cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                             "automata-nexus")
+    cached = os.path.join(cache_dir, f"logo-250x80-{int(st.st_mtime)}-{st.st_size}.png")
+    if not os.path.exists(cached):
+        from PIL import Image
+        os.makedirs(cache_dir, exist_ok=True)
+        Image.open(src).resize(LOGO_SIZE, Image.Resampling.LANCZOS).save(cached, optimize=True)
+    return cached
+
+
+# System packages needed to build and run the application
+SYSTEM_DEPS = [
+    "python3.11", "python3.11-dev", "python3.11-venv",
+    "nodejs", "npm", "build-essential", "git",
+    "libwebkit2gtk-4.0-dev", "libssl-dev", "libgtk-3-dev",
+    "libayatana-appindicator3-dev", "librsvg2-dev",
+    "i2c-tools", "libi2c-dev", "libudev-dev", "pkg-config",
+    "pigz"
+]
+
+# Nice to have but not in every mirror; installed separately so a missing
+# package can't fail the transaction above, and the build runs without them
+OPTIONAL_DEPS = ["sccache"]
+
+APT_INSTALL = ["apt-get", "install", "-y", "--no-install-recommends",
+               "-o", "Dpkg::Use-Pty=0"]
+
+# SD card image backup before migrating
+SD_DEVICE = "/dev/mmcblk0"
+BACKUP_BLOCK_SIZE = "16M"
+
+# Performance monitor installed next to the application. Samples CPU and
+# disk activity straight from /proc over one second each hour, instead of
+# running top and a 10 second iostat, and writes one JSON line per sample.
+MONITOR_SCRIPT = """#!/usr/bin/env python3
+# Performance monitoring for Automata Nexus
+
+import json
+import os
+import subprocess
+import time
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "performance")
+INTERVAL = 3600  # seconds between samples
+CLEANUP_INTERVAL = 86400
+RETENTION_DAYS = 7
+
+
+def cpu_times():
+    with open("/proc/stat") as f:
+        return [int(v) for v in f.readline().split()[1:]]
+
+
+def disk_stats():
+    # Whole disks only: reads, sectors read, writes, sectors written, busy ms
+    disks = {name for name in os.listdir("/sys/block")
+             if not name.startswith(("loop", "ram", "zram"))}
+    stats = {}
+    with open("/proc/diskstats") as f:
+        for line in f:
+            fields = line.split()
+            if fields[2] in disks:
+                stats[fields[2]] = [int(fields[i]) for i in (3, 5, 7, 9, 12)]
+    return stats
+
+
+def nvme_health():
+    try:
+        result = subprocess.run(["nvme", "smart-log", "/dev/nvme0", "-o", "json"],
+                                capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
+
+
+def sample():
+    cpu0, disk0 = cpu_times(), disk_stats()
+    time.sleep(1)
+    cpu1, disk1 = cpu_times(), disk_stats()
+    
+    total = sum(cpu1) - sum(cpu0)
+    idle = sum(cpu1[3:5]) - sum(cpu0[3:5])
+    disks = {}
+    for name, after in disk1.items():
+        before = disk0.get(name, after)
+        delta = [a - b for a, b in zip(after, before)]
+        disks[name] = {
+            "reads_s": delta[0],
+            "read_kb_s": delta[1] / 2,
+            "writes_s": delta[2],
+            "write_kb_s": delta[3] / 2,
+            "util_percent": min(100.0, delta[4] / 10),
+        }
+        
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_percent": round(100 * (total - idle) / total, 1) if total else 0.0,
+        "load": os.getloadavg(),
+        "disks": disks,
+        "nvme": nvme_health() if os.path.exists("/dev/nvme0") else None,
+    }
+
+
+def cleanup():
+    cutoff = time.time() - RETENTION_DAYS * 86400
+    for entry in os.scandir(LOG_DIR):
+        if entry.name.endswith(".jsonl") and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+
+
+def main():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    last_cleanup = 0
+    while True:
+        path = os.path.join(LOG_DIR, time.strftime("metrics-%Y%m%d.jsonl"))
+        with open(path, "a") as f:
+            f.write(json.dumps(sample()) + "\\n")
+            
+        if time.time() - last_cleanup >= CLEANUP_INTERVAL:
+            cleanup()
+            last_cleanup = time.time()
+            
+        time.sleep(INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+CARGO = "/root/.cargo/bin/cargo"
+RUST_TARGET = "aarch64-unknown-linux-gnu"
+
 
 class SmartInstallerRPi5:
     def __init__(self):
@@ -30,11 +468,37 @@ class SmartInstallerRPi5:
         self.ssd_mount_point = None
         self.existing_os = False
         
+        # Option values, copied from the Tk variables when installation starts
+        self.backup_dir = ""
+        self.requested_path = ""
+        self.backup_sd_enabled = False
+        self.optimize_ssd_enabled = False
+        self.monitoring_enabled = False
+        
         # Paths
         self.install_path = None
         self.service_name = "automata-nexus"
         
+        # Background apt download started with the installation
+        self._apt_prefetch = None
+        self._apt_prefetched = False
+        
+        # Filesystem UUIDs by device number, shared by boot config and fstab
+        self._uuids = {}
+        
+        # Log lines and GUI calls from the installation thread; only the
+        # main loop touches widgets
+        self._ui_queue = queue.Queue()
+        
+        # Full log on disk; the widget only keeps the newest lines
+        try:
+            self._log_file = open(INSTALL_LOG, 'a', buffering=64 * 1024)
+            self._log_file.write(f"=== {datetime.now():%Y-%m-%d %H:%M:%S} installer started ===\n")
+        except OSError:
+            self._log_file = None
+        
         self.setup_gui()
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
         
     def setup_gui(self):
         """Create the installer GUI"""
@@ -45,11 +509,12 @@ class SmartInstallerRPi5:
         
         # Logo
         try:
-            logo_path = os.path.join(os.path.dirname(__file__), "..", "public", "automata-nexus-logo.png")
-            if os.path.exists(logo_path):
-                img = Image.open(logo_path)
-                img = img.resize((250, 80), Image.Resampling.LANCZOS)
-                self.logo = ImageTk.PhotoImage(img)
+            public_dir = os.path.join(os.path.dirname(__file__), "..", "public")
+            logo_path = os.path.join(public_dir, LOGO_FILE)
+            if not os.path.exists(logo_path):
+                logo_path = _scaled_logo(os.path.join(public_dir, "automata-nexus-logo.png"))
+            if logo_path:
+                self.logo = tk.PhotoImage(file=logo_path)
                 logo_label = tk.Label(header_frame, image=self.logo, bg="#1a1a1a")
                 logo_label.pack(pady=10)
         except:
@@ -171,6 +636,12 @@ class SmartInstallerRPi5:
             variable=self.backup_sd
         ).pack(anchor=tk.W)
         
+        backup_dir_frame = tk.Frame(options_frame)
+        backup_dir_frame.pack(anchor=tk.W, padx=20)
+        self.backup_dir_var = tk.StringVar(value="")
+        tk.Label(backup_dir_frame, text="Backup to:").pack(side=tk.LEFT)
+        tk.Entry(backup_dir_frame, textvariable=self.backup_dir_var, width=40).pack(side=tk.LEFT, padx=10)
+        
         self.optimize_ssd = tk.BooleanVar(value=True)
         tk.Checkbutton(
             options_frame,
@@ -209,10 +680,13 @@ class SmartInstallerRPi5:
         self.progress_label.pack(pady=10)
         
         # Progress bar
+        self.progress_var = tk.IntVar(value=0)
         self.progress_bar = ttk.Progressbar(
             self.progress_frame,
             length=600,
-            mode='determinate'
+            mode='determinate',
+            maximum=100,
+            variable=self.progress_var
         )
         self.progress_bar.pack(pady=10)
         
@@ -225,17 +699,30 @@ class SmartInstallerRPi5:
         )
         self.current_task.pack(pady=5)
         
-        # Log output
-        self.log_text = scrolledtext.ScrolledText(
-            self.progress_frame,
-            wrap=tk.WORD,
+        # Log output. A Listbox holds one item per line and only draws the
+        # visible rows, so appends stay cheap however long the log gets
+        log_frame = tk.Frame(self.progress_frame)
+        log_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        
+        log_scroll_y = tk.Scrollbar(log_frame, orient=tk.VERTICAL)
+        log_scroll_x = tk.Scrollbar(log_frame, orient=tk.HORIZONTAL)
+        self.log_text = tk.Listbox(
+            log_frame,
             width=80,
             height=20,
             bg="#1a1a1a",
             fg="#00ff00",
-            font=("Courier", 9)
+            font=("Courier", 9),
+            activestyle=tk.NONE,
+            highlightthickness=0,
+            yscrollcommand=log_scroll_y.set,
+            xscrollcommand=log_scroll_x.set
         )
-        self.log_text.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        log_scroll_y.config(command=self.log_text.yview)
+        log_scroll_x.config(command=self.log_text.xview)
+        log_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        log_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
     def detect_ssd_setup(self):
         """Detect current SSD configuration"""
@@ -300,53 +787,42 @@ class SmartInstallerRPi5:
             
     def find_nvme_devices(self):
         """Find all NVMe devices"""
-        devices = []
         try:
-            result = subprocess.run(['lsblk', '-d', '-o', 'NAME,TYPE,SIZE'], 
-                                  capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if 'nvme' in line:
-                    device = line.split()[0]
-                    devices.append(f"/dev/{device}")
-        except:
-            pass
-        return devices
+            return [f"/dev/{name}" for name in sorted(os.listdir('/sys/block'))
+                    if name.startswith('nvme')]
+        except OSError:
+            return []
         
     def check_mount_status(self, device):
         """Check if device is mounted and gather info"""
         try:
             # Check all partitions
-            result = subprocess.run(['lsblk', '-J', device], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                import json
-                data = json.loads(result.stdout)
+            mounts = _mounts()
+            for name, dev in _partitions(device):
+                mount_point = mounts.get(dev)
+                if not mount_point:
+                    continue
+                    
+                # Get disk usage
+                st = os.statvfs(mount_point)
+                size = st.f_blocks * st.f_frsize
+                used = (st.f_blocks - st.f_bfree) * st.f_frsize
+                free = st.f_bavail * st.f_frsize
+                use_percent = -(-100 * used // (used + free)) if used + free else 0
                 
-                for disk in data.get('blockdevices', []):
-                    for child in disk.get('children', []):
-                        if child.get('mountpoint'):
-                            mount_point = child['mountpoint']
-                            
-                            # Get disk usage
-                            df_result = subprocess.run(['df', '-h', mount_point], 
-                                                     capture_output=True, text=True)
-                            lines = df_result.stdout.strip().split('\n')
-                            if len(lines) > 1:
-                                parts = lines[1].split()
-                                
-                                # Check for OS indicators
-                                has_os = any(os.path.exists(os.path.join(mount_point, d)) 
-                                           for d in ['boot', 'etc', 'usr', 'var'])
-                                
-                                return {
-                                    'mount_point': mount_point,
-                                    'size': parts[1],
-                                    'used': parts[2],
-                                    'free': parts[3],
-                                    'use_percent': parts[4],
-                                    'has_os': has_os
-                                }
-        except:
+                # Check for OS indicators
+                has_os = any(os.path.exists(os.path.join(mount_point, d)) 
+                           for d in ['boot', 'etc', 'usr', 'var'])
+                
+                return {
+                    'mount_point': mount_point,
+                    'size': _human_size(size),
+                    'used': _human_size(used),
+                    'free': _human_size(free),
+                    'use_percent': f"{use_percent}%",
+                    'has_os': has_os
+                }
+        except OSError:
             pass
         return None
         
@@ -362,8 +838,9 @@ class SmartInstallerRPi5:
         if self.ssd_mount_point:
             possible_paths.insert(0, os.path.join(self.ssd_mount_point, "automata-nexus"))
             
+        # One stat per candidate: app/ existing implies its parent does
         for path in possible_paths:
-            if os.path.exists(path) and os.path.exists(os.path.join(path, "app")):
+            if os.path.isdir(os.path.join(path, "app")):
                 return path
                 
         return None
@@ -372,7 +849,6 @@ class SmartInstallerRPi5:
         """Log to detection text area"""
         self.detection_text.insert(tk.END, message + "\n")
         self.detection_text.see(tk.END)
-        self.root.update()
         
     def start_installation(self):
         """Start the installation process"""
@@ -396,6 +872,20 @@ class SmartInstallerRPi5:
             ):
                 return
                 
+        # Tk variables are only read on the GUI thread; the worker uses copies
+        self.requested_path = self.path_var.get()
+        self.backup_sd_enabled = self.backup_sd.get()
+        self.optimize_ssd_enabled = self.optimize_ssd.get()
+        self.monitoring_enabled = self.enable_monitoring.get()
+        
+        # The SD backup must go to a drive that is neither the card nor the SSD
+        self.backup_dir = self.backup_dir_var.get().strip()
+        if mode == "new" and self.backup_sd_enabled:
+            error = _backup_dest_error(self.backup_dir, self.ssd_device)
+            if error:
+                messagebox.showerror("Backup Destination", error)
+                return
+                
         # Switch to progress tab
         self.notebook.select(self.progress_frame)
         
@@ -413,6 +903,11 @@ class SmartInstallerRPi5:
     def run_installation(self, mode):
         """Run the appropriate installation based on mode"""
         try:
+            # Modes that install dependencies start downloading them now
+            if mode in ("existing", "dual"):
+                self._apt_prefetch = threading.Thread(target=self.prefetch_dependencies, daemon=True)
+                self._apt_prefetch.start()
+                
             if mode == "existing":
                 self.install_on_existing_ssd()
             elif mode == "new":
@@ -421,9 +916,10 @@ class SmartInstallerRPi5:
                 self.setup_dual_mode()
                 
             self.log("\n✅ Installation completed successfully!")
-            self.progress_label.config(text="Installation Complete!")
+            self.call_in_gui(self.progress_label.config, text="Installation Complete!")
             
-            messagebox.showinfo(
+            self.call_in_gui(
+                messagebox.showinfo,
                 "Success",
                 "Installation completed successfully!\n\n"
                 f"Access the web interface at:\n"
@@ -432,14 +928,14 @@ class SmartInstallerRPi5:
             
         except Exception as e:
             self.log(f"\n❌ Installation failed: {str(e)}")
-            messagebox.showerror("Installation Failed", str(e))
+            self.call_in_gui(messagebox.showerror, "Installation Failed", str(e))
             
     def install_on_existing_ssd(self):
         """Install on existing SSD without disturbing current data"""
         self.log("=== Installing on Existing SSD ===")
         
         # Determine installation path
-        install_path = self.path_var.get()
+        install_path = self.requested_path
         if not install_path.startswith('/'):
             install_path = os.path.join(self.ssd_mount_point or '/mnt/ssd', install_path)
             
@@ -449,20 +945,23 @@ class SmartInstallerRPi5:
         # Create directory structure
         self.update_progress("Creating directories", 10)
         os.makedirs(install_path, exist_ok=True)
-        os.makedirs(f"{install_path}/data", exist_ok=True)
-        os.makedirs(f"{install_path}/logs", exist_ok=True)
-        os.makedirs(f"{install_path}/cache", exist_ok=True)
+        for subdir in ("data", "logs", "cache"):
+            _mkdir(f"{install_path}/{subdir}")
+        
+        # Copy application while the dependency prefetch downloads
+        self.update_progress("Copying application", 15)
+        self.copy_application()
         
         # Install dependencies
-        self.update_progress("Installing system dependencies", 20)
+        self.update_progress("Installing system dependencies", 25)
         self.install_dependencies()
         
-        # Copy application
-        self.update_progress("Installing application", 40)
-        self.install_application()
+        # Build application
+        self.update_progress("Building application", 40)
+        self.build_application()
         
         # Apply optimizations if requested
-        if self.optimize_ssd.get():
+        if self.optimize_ssd_enabled:
             self.update_progress("Applying SSD optimizations", 60)
             self.apply_ssd_optimizations()
             
@@ -471,7 +970,7 @@ class SmartInstallerRPi5:
         self.setup_service()
         
         # Enable monitoring if requested
-        if self.enable_monitoring.get():
+        if self.monitoring_enabled:
             self.update_progress("Setting up monitoring", 90)
             self.setup_monitoring()
             
@@ -482,7 +981,7 @@ class SmartInstallerRPi5:
         self.log("=== Setting up New SSD ===")
         
         # Backup SD card if requested
-        if self.backup_sd.get():
+        if self.backup_sd_enabled:
             self.update_progress("Backing up SD card", 10)
             self.backup_sd_card()
             
@@ -559,40 +1058,57 @@ class SmartInstallerRPi5:
         if os.path.exists(f"{self.ssd_device}1"):
             partition = f"{self.ssd_device}1"
             
-        self.run_command(['mount', partition, self.ssd_mount_point])
+        self.run_command(['mount', partition, self.ssd_mount_point], quiet=True)
         self.log(f"Mounted SSD at {self.ssd_mount_point}")
         
     def migrate_os_to_ssd(self):
         """Migrate OS from SD card to SSD"""
         self.log("Migrating OS to SSD (this will take time)...")
         
-        # Use rsync to copy entire system
+        # Stream the root filesystem through a tar pipe. This is a fresh copy
+        # onto an empty filesystem, so rsync's per-file delta and checksum
+        # work buys nothing
         exclude_dirs = [
-            '/dev/*', '/proc/*', '/sys/*', '/tmp/*', '/run/*',
-            '/mnt/*', '/media/*', '/lost+found', '/boot/firmware/*'
+            'dev/*', 'proc/*', 'sys/*', 'tmp/*', 'run/*',
+            'mnt/*', 'media/*', 'lost+found', 'boot/firmware/*'
         ]
         
-        rsync_cmd = ['rsync', '-axHAWXS', '--numeric-ids', '--info=progress2']
+        tar_create = ['tar', '-C', '/', '--one-file-system', '--numeric-owner',
+                      '--xattrs', '--acls',
+                      '--checkpoint=10000', '--checkpoint-action=echo=%T']
         for exclude in exclude_dirs:
-            rsync_cmd.extend(['--exclude', exclude])
+            tar_create.append(f'--exclude=./{exclude}')
+        tar_create.extend(['-cf', '-', '.'])
+        
+        tar_extract = ['tar', '-C', self.ssd_mount_point, '--numeric-owner',
+                       '--xattrs', '--xattrs-include=*', '--acls', '-xpf', '-']
+        
+        self.log(f"Running: {shlex.join(tar_create)} | {shlex.join(tar_extract)}")
+        
+        # The extracting side's errors go to a file so a burst of warnings
+        # can't fill a pipe nobody is reading and stall the copy
+        with tempfile.TemporaryFile() as extract_errors:
+            read_fd, write_fd = _big_pipe()
+            try:
+                create = subprocess.Popen(_resolve(tar_create), stdout=write_fd, stderr=subprocess.PIPE)
+                extract = subprocess.Popen(_resolve(tar_extract), stdin=read_fd, stderr=extract_errors)
+            finally:
+                os.close(read_fd)
+                os.close(write_fd)
             
-        rsync_cmd.extend(['/', f'{self.ssd_mount_point}/'])
-        
-        # Run rsync with progress
-        process = subprocess.Popen(
-            rsync_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
-        
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                self.log(f"  {line.strip()}")
+            # Checkpoint progress lines from the creating tar
+            self.stream_output(create.stderr)
+                
+            create.wait()
+            extract.wait()
+            
+            # tar exits 1 when files changed while being read, expected on a live system
+            if create.returncode > 1 or extract.returncode != 0:
+                extract_errors.seek(0)
+                error = extract_errors.read().decode(errors='replace')
+                raise Exception(f"OS migration failed (tar create exited {create.returncode}, "
+                                f"tar extract exited {extract.returncode}): {error}")
                 
-        process.wait()
-        
         # Copy boot files separately
         self.log("Copying boot files...")
         boot_src = "/boot/firmware"
@@ -600,6 +1116,57 @@ class SmartInstallerRPi5:
         os.makedirs(boot_dst, exist_ok=True)
         self.run_command(['rsync', '-av', f'{boot_src}/', f'{boot_dst}/'])
         
+    def stream_output(self, *streams, capture=None):
+        """Relay children's output to the log without a GUI update per line
+
+        Waits on all streams with a selector, reads whatever is available in
+        64 KiB chunks and, at most every LOG_INTERVAL seconds, logs only the
+        newest LOG_TAIL_LINES complete lines in one call. A quiet command gets
+        a heartbeat line every HEARTBEAT_INTERVAL seconds. Raw chunks are
+        written to the file capture[fd] when capture is given. Returns once
+        every stream hits EOF.
+        """
+        selector = selectors.DefaultSelector()
+        for stream in streams:
+            # data holds the stream's trailing partial line
+            selector.register(stream.fileno(), selectors.EVENT_READ, [b''])
+            
+        tail = deque(maxlen=LOG_TAIL_LINES)
+        start = last_flush = last_output = time.monotonic()
+        
+        def flush():
+            self.log("\n".join(f"  {line.decode(errors='replace').strip()}" for line in tail))
+            tail.clear()
+            
+        with selector:
+            while selector.get_map():
+                for key, _ in selector.select(timeout=POLL_INTERVAL):
+                    partial = key.data
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fd)
+                        if partial[0].strip():
+                            tail.append(partial[0])
+                        continue
+                    if capture is not None:
+                        capture[key.fd].write(chunk)
+                    # rsync and tar redraw progress with \r, treat it as a line end
+                    lines = (partial[0] + chunk).replace(b'\r', b'\n').split(b'\n')
+                    partial[0] = lines.pop()
+                    tail.extend(line for line in lines if line.strip())
+                    last_output = time.monotonic()
+                    
+                now = time.monotonic()
+                if tail and now - last_flush >= LOG_INTERVAL:
+                    flush()
+                    last_flush = now
+                elif not tail and now - last_output >= HEARTBEAT_INTERVAL:
+                    self.log(f"  ... still running ({now - start:.0f}s)")
+                    last_output = now
+                    
+        if tail:
+            flush()
+            
     def update_boot_config(self):
         """Update boot configuration to use SSD"""
         self.log("Updating boot configuration...")
@@ -609,9 +1176,9 @@ class SmartInstallerRPi5:
         if os.path.exists(f"{self.ssd_device}1"):
             partition = f"{self.ssd_device}1"
             
-        result = subprocess.run(['blkid', '-o', 'value', '-s', 'UUID', partition],
-                              capture_output=True, text=True)
-        ssd_uuid = result.stdout.strip()
+        ssd_uuid = self.uuid_for_dev(os.stat(partition).st_rdev)
+        if not ssd_uuid:
+            raise Exception(f"No filesystem UUID found for {partition}")
         
         # Update cmdline.txt
         cmdline_path = "/boot/firmware/cmdline.txt"
@@ -619,8 +1186,7 @@ class SmartInstallerRPi5:
             cmdline = f.read().strip()
             
         # Replace root device
-        import re
-        cmdline = re.sub(r'root=\S+', f'root=UUID={ssd_uuid}', cmdline)
+        cmdline = _ROOT_RE.sub(f'root=UUID={ssd_uuid}', cmdline)
         
         # Backup original
         shutil.copy(cmdline_path, f"{cmdline_path}.sd-backup")
@@ -638,58 +1204,135 @@ class SmartInstallerRPi5:
             f.write("tmpfs /tmp tmpfs defaults,noatime,mode=1777 0 0\n")
             
     def backup_sd_card(self):
-        """Create backup of SD card"""
-        backup_path = f"{self.ssd_mount_point}/sd-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.img"
+        """Create backup of SD card on a drive other than the SD card and SSD"""
+        error = _backup_dest_error(self.backup_dir, self.ssd_device)
+        if error:
+            raise Exception(error)
+        backup_path = f"{self.backup_dir}/sd-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.img"
+        
+        # Large direct reads straight from the card, compressed on every core
+        # when pigz is available; otherwise a sparse raw image
+        dd = ['dd', f'if={SD_DEVICE}', f'bs={BACKUP_BLOCK_SIZE}', 'iflag=direct', 'status=progress']
+        pigz = shutil.which('pigz')
+        if pigz:
+            backup_path += '.gz'
+        else:
+            dd.append('conv=sparse')
+            
         self.log(f"Creating SD card backup at {backup_path}")
         self.log("This will take a while...")
         
-        # Note: In production, you'd want to use dd with progress
-        self.log("(Backup simulation - actual implementation would use dd)")
+        compress = None
+        with open(backup_path, 'wb') as out:
+            if pigz:
+                read_fd, write_fd = _big_pipe()
+                try:
+                    copy = subprocess.Popen(_resolve(dd), stdout=write_fd, stderr=subprocess.PIPE)
+                    compress = subprocess.Popen([pigz, '-1'], stdin=read_fd, stdout=out)
+                finally:
+                    os.close(read_fd)
+                    os.close(write_fd)
+            else:
+                copy = subprocess.Popen(_resolve(dd), stdout=out, stderr=subprocess.PIPE)
+                
+            # dd's status=progress lines
+            self.stream_output(copy.stderr)
+            
+            copy.wait()
+            if compress:
+                compress.wait()
+                
+        if copy.returncode != 0 or (compress and compress.returncode != 0):
+            raise Exception("SD card backup failed")
+        
+    def prefetch_dependencies(self):
+        """Download dependency packages ahead of install_dependencies"""
+        try:
+            # Output is never looked at, so don't buffer it
+            subprocess.run(_resolve(["apt-get", "update"]), check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            subprocess.run(_resolve(APT_INSTALL + ["--download-only"] + SYSTEM_DEPS), check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.CalledProcessError):
+            # install_dependencies repeats both steps and reports any failure
+            return
+        self._apt_prefetched = True
         
     def install_dependencies(self):
         """Install system dependencies"""
         self.log("Installing system dependencies...")
         
-        deps = [
-            "python3.11", "python3.11-dev", "python3.11-venv",
-            "nodejs", "npm", "build-essential", "git",
-            "libwebkit2gtk-4.0-dev", "libssl-dev", "libgtk-3-dev",
-            "libayatana-appindicator3-dev", "librsvg2-dev",
-            "i2c-tools", "libi2c-dev", "libudev-dev", "pkg-config"
-        ]
-        
-        self.run_command(["apt-get", "update"])
-        self.run_command(["apt-get", "install", "-y"] + deps)
+        # apt holds its locks while the prefetch runs, so wait for it
+        if self._apt_prefetch is not None:
+            self._apt_prefetch.join()
+            
+        if not self._apt_prefetched:
+            self.run_command(["apt-get", "update"])
+        self.run_command(APT_INSTALL + SYSTEM_DEPS)
+        try:
+            self.run_command(APT_INSTALL + OPTIONAL_DEPS)
+        except CommandError:
+            self.log(f"⚠️  Optional packages unavailable ({', '.join(OPTIONAL_DEPS)}), continuing without them")
         
     def install_application(self):
         """Install the application"""
-        self.log(f"Installing application to {self.install_path}")
+        self.copy_application()
+        self.build_application()
         
-        # Copy application files
+    def copy_application(self):
+        """Copy the application files to the install path"""
+        self.log(f"Installing application to {self.install_path}")
         app_source = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        shutil.copytree(app_source, f"{self.install_path}/app", dirs_exist_ok=True)
+        _copy_tree(app_source, f"{self.install_path}/app",
+                   progress=lambda done, total: self.log(f"  Copied {done}/{total} files"))
         
-        # Build application
+    def build_application(self):
+        """Build the copied application"""
         os.chdir(f"{self.install_path}/app")
         
-        # Install npm dependencies
-        self.log("Installing Node.js dependencies...")
-        self.run_command(["npm", "install"])
-        
-        # Build frontend
-        self.log("Building frontend...")
-        self.run_command(["npm", "run", "build"])
-        
+        # Install Rust if needed
+        if not os.path.exists(CARGO):
+            self.install_rust()
+            
+        # Download crates in the background; the frontend build doesn't need them
+        self.log("Fetching Rust dependencies in the background...")
+        with tempfile.TemporaryFile() as fetch_errors:
+            fetch = subprocess.Popen([CARGO, "fetch", "--target", RUST_TARGET,
+                                      "--manifest-path", f"{self.install_path}/app/src-tauri/Cargo.toml"],
+                                     stdout=subprocess.DEVNULL, stderr=fetch_errors)
+            try:
+                # Install npm dependencies
+                self.log("Installing Node.js dependencies...")
+                self.run_command(["npm", "install", "--prefer-offline", "--no-audit", "--no-fund"])
+                
+                # Build frontend
+                self.log("Building frontend...")
+                self.run_command(["npm", "run", "build"])
+            finally:
+                fetch.wait()
+                
+            if fetch.returncode != 0:
+                raise CommandError(fetch.args, fetch.returncode,
+                                   _read_spool(fetch_errors, ERROR_TAIL_BYTES))
+                
         # Build Rust backend
         self.log("Building Rust backend...")
         os.chdir(f"{self.install_path}/app/src-tauri")
         
-        # Install Rust if needed
-        if not os.path.exists("/root/.cargo/bin/cargo"):
-            self.install_rust()
-            
-        self.run_command(["/root/.cargo/bin/cargo", "build", "--release", 
-                         "--target", "aarch64-unknown-linux-gnu"])
+        self.run_command([CARGO, "build", "--release", "--offline",
+                         "--target", RUST_TARGET], env=self.cargo_env())
+        
+    def cargo_env(self):
+        """Environment for the release build: every core, and a compiler
+        cache on the install path so reinstalls reuse compiled crates"""
+        env = dict(os.environ,
+                   CARGO_BUILD_JOBS=str(os.cpu_count() or 4),
+                   CARGO_INCREMENTAL="0",
+                   CARGO_NET_GIT_FETCH_WITH_CLI="true")
+        if shutil.which("sccache"):
+            env["RUSTC_WRAPPER"] = "sccache"
+            env["SCCACHE_DIR"] = f"{self.install_path}/.sccache"
+        return env
         
     def install_rust(self):
         """Install Rust toolchain"""
@@ -699,7 +1342,13 @@ class SmartInstallerRPi5:
                          "https://sh.rustup.rs", "-o", rust_installer])
         self.run_command(["sh", rust_installer, "-y"])
         self.run_command(["/root/.cargo/bin/rustup", "target", "add", 
-                         "aarch64-unknown-linux-gnu"])
+                         RUST_TARGET])
+        
+    def uuid_for_dev(self, dev):
+        """Resolve a filesystem UUID once per device"""
+        if dev not in self._uuids:
+            self._uuids[dev] = _uuid_for_dev(dev)
+        return self._uuids[dev]
         
     def apply_ssd_optimizations(self):
         """Apply SSD-specific optimizations"""
@@ -707,24 +1356,18 @@ class SmartInstallerRPi5:
         
         # Mount options
         if self.ssd_mount_point:
-            # Get device UUID
-            result = subprocess.run(['findmnt', '-n', '-o', 'SOURCE', self.ssd_mount_point],
-                                  capture_output=True, text=True)
-            device = result.stdout.strip()
-            
-            if device:
-                result = subprocess.run(['blkid', '-o', 'value', '-s', 'UUID', device],
-                                      capture_output=True, text=True)
-                uuid = result.stdout.strip()
-                
+            # Get device UUID from the device backing the mount point
+            uuid = self.uuid_for_dev(os.stat(self.ssd_mount_point).st_dev)
+            
+            if uuid:
                 # Update fstab with optimized options
                 fstab_line = f"UUID={uuid} {self.ssd_mount_point} ext4 defaults,noatime,nodiratime 0 2\n"
                 
                 # Add to fstab if not exists
-                with open('/etc/fstab', 'r') as f:
+                with open('/etc/fstab', 'r+') as f:
                     if uuid not in f.read():
-                        with open('/etc/fstab', 'a') as f:
-                            f.write(fstab_line)
+                        f.seek(0, os.SEEK_END)
+                        f.write(fstab_line)
                             
         # System optimizations
         with open('/etc/sysctl.d/99-ssd-optimizations.conf', 'w') as f:
@@ -735,10 +1378,11 @@ vm.dirty_background_ratio=5
 vm.dirty_ratio=10
 """)
         
-        self.run_command(['sysctl', '-p', '/etc/sysctl.d/99-ssd-optimizations.conf'])
-        
-        # Enable TRIM
-        self.run_command(['systemctl', 'enable', 'fstrim.timer'])
+        # Load the settings and enable TRIM
+        self.run_many([
+            ['sysctl', '-p', '/etc/sysctl.d/99-ssd-optimizations.conf'],
+            ['systemctl', 'enable', 'fstrim.timer'],
+        ], quiet=True)
         
     def setup_service(self):
         """Setup systemd service"""
@@ -747,17 +1391,19 @@ vm.dirty_ratio=10
         service_content = f"""[Unit]
 Description=Automata Nexus Automation Control Center
 After=network.target
+StartLimitIntervalSec=60
+StartLimitBurst=10
 
 [Service]
-Type=simple
+Type=exec
 User=Automata
 Group=Automata
 WorkingDirectory={self.install_path}/app
 Environment="NODE_ENV=production"
 Environment="DATABASE_PATH={self.install_path}/data/metrics.db"
 ExecStart={self.install_path}/app/src-tauri/target/aarch64-unknown-linux-gnu/release/building-automation-controller
-Restart=always
-RestartSec=10
+Restart=on-failure
+RestartSec=2
 
 [Install]
 WantedBy=multi-user.target
@@ -766,83 +1412,155 @@ WantedBy=multi-user.target
         with open(f'/etc/systemd/system/{self.service_name}.service', 'w') as f:
             f.write(service_content)
             
-        self.run_command(['systemctl', 'daemon-reload'])
-        self.run_command(['systemctl', 'enable', self.service_name])
+        self.run_command(['systemctl', 'daemon-reload'], quiet=True)
+        self.run_command(['systemctl', 'enable', self.service_name], quiet=True)
         
     def setup_monitoring(self):
         """Setup performance monitoring"""
         self.log("Setting up performance monitoring...")
         
         # Create monitoring script
-        monitor_script = f"""#!/bin/bash
-# Performance monitoring for Automata Nexus
-
-LOG_DIR="{self.install_path}/logs/performance"
-mkdir -p "$LOG_DIR"
-
-while true; do
-    DATE=$(date +%Y%m%d-%H%M%S)
-    
-    # System metrics
-    top -bn1 > "$LOG_DIR/top-$DATE.log"
-    iostat -x 1 10 > "$LOG_DIR/iostat-$DATE.log"
-    
-    # SSD health
-    if [ -e /dev/nvme0 ]; then
-        nvme smart-log /dev/nvme0 > "$LOG_DIR/nvme-$DATE.log" 2>/dev/null
-    fi
-    
-    # Clean old logs
-    find "$LOG_DIR" -name "*.log" -mtime +7 -delete
-    
-    sleep 3600
-done
-"""
-        
-        script_path = f"{self.install_path}/monitor.sh"
+        script_path = f"{self.install_path}/monitor.py"
         with open(script_path, 'w') as f:
-            f.write(monitor_script)
+            f.write(MONITOR_SCRIPT)
             
         os.chmod(script_path, 0o755)
         
-    def run_command(self, cmd):
-        """Run command and log output"""
-        if isinstance(cmd, list):
-            cmd_str = " ".join(cmd)
-        else:
-            cmd_str = cmd
+        monitor_service = f"""[Unit]
+Description=Automata Nexus performance monitor
+After={self.service_name}.service
+
+[Service]
+Type=simple
+ExecStart=/usr/bin/python3 {script_path}
+Nice=10
+Restart=on-failure
+
+[Install]
+WantedBy=multi-user.target
+"""
+        
+        with open(f'/etc/systemd/system/{self.service_name}-monitor.service', 'w') as f:
+            f.write(monitor_service)
             
-        self.log(f"Running: {cmd_str}")
+        self.run_command(['systemctl', 'daemon-reload'], quiet=True)
+        self.run_command(['systemctl', 'enable', f'{self.service_name}-monitor'], quiet=True)
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    def run_command(self, cmd, env=None, capture=False, quiet=False):
+        """Run command and log output
+
+        Output is spooled (to disk past CAPTURE_SPOOL_SIZE) rather than held
+        as strings, and only read back on failure or when capture is set, in
+        which case stdout is returned. quiet sends stdout to /dev/null for
+        commands whose normal output is noise; stderr is still logged.
+        Otherwise, unless stdout is captured, stderr is merged into it so
+        there is a single pipe to drain.
+        """
+        # Formatted for display by the GUI thread, not here
+        self._ui_queue.put(tuple(cmd) if isinstance(cmd, list) else (cmd,))
+        
+        with tempfile.SpooledTemporaryFile(CAPTURE_SPOOL_SIZE) as stdout, \
+             tempfile.SpooledTemporaryFile(CAPTURE_SPOOL_SIZE) as stderr:
+            # An absolute path spares the child its own $PATH search before exec
+            argv = _resolve(cmd) if isinstance(cmd, list) else cmd
+            if capture:
+                out, err = subprocess.PIPE, subprocess.PIPE
+            elif quiet:
+                out, err = subprocess.DEVNULL, subprocess.PIPE
+            else:
+                out, err = subprocess.PIPE, subprocess.STDOUT
+            proc = subprocess.Popen(argv, env=env, stdout=out, stderr=err)
+            if isinstance(cmd, list) and os.path.basename(cmd[0]) in BUILD_COMMANDS:
+                _deprioritize(proc.pid)
+            streams = {stream: spool for stream, spool in ((proc.stdout, stdout), (proc.stderr, stderr))
+                       if stream}
+            with proc:
+                self.stream_output(*streams, capture={stream.fileno(): spool
+                                                      for stream, spool in streams.items()})
+                
+            if proc.returncode != 0:
+                error = (_read_spool(stderr, ERROR_TAIL_BYTES) or
+                         _read_spool(stdout, ERROR_TAIL_BYTES))
+                raise CommandError(cmd, proc.returncode, error)
+                
+            if capture:
+                return _read_spool(stdout)
+            return None
         
-        if result.returncode != 0:
-            error = result.stderr or result.stdout
-            raise Exception(f"Command failed: {error}")
-            
-        return result.stdout
+    def run_many(self, commands, max_workers=4, fail_fast=True, **kwargs):
+        """Run independent commands concurrently, results in command order
+
+        kwargs go to run_command. With fail_fast, queued commands are dropped
+        after a failure, and the first failure is re-raised once the running
+        ones finish. Keep anything that takes the dpkg lock serial.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.run_command, cmd, **kwargs) for cmd in commands]
+            wait(futures, return_when=FIRST_EXCEPTION if fail_fast else ALL_COMPLETED)
+            for future in futures:
+                future.cancel()
+                
+        for future in futures:
+            if not future.cancelled() and future.exception():
+                raise future.exception()
+        return [future.result() for future in futures]
         
     def log(self, message):
-        """Log to progress text area"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update()
+        """Log to progress text area (safe from the installation thread)"""
+        self._ui_queue.put(message)
+        
+    def call_in_gui(self, func, *args, **kwargs):
+        """Run func on the Tk main loop after any log lines already queued"""
+        self._ui_queue.put(lambda: func(*args, **kwargs))
         
     def update_progress(self, task, percentage):
         """Update progress display"""
-        self.current_task.config(text=task)
-        self.progress_bar['value'] = percentage
+        def show():
+            self.current_task.config(text=task)
+            self.progress_var.set(percentage)
+        self.call_in_gui(show)
         self.log(f"\n>>> {task} ({percentage}%)")
-        self.root.update()
+        
+    def _drain_ui_queue(self):
+        """Apply queued log lines in one insert per run and queued GUI calls in order
+
+        Items are log lines, argv tuples of commands being run, or callables.
+        """
+        lines = []
+        while True:
+            try:
+                item = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+            if isinstance(item, tuple):
+                lines.append(f"Running: {shlex.join(item)}")
+                continue
+            self._append_log(lines)
+            lines = []
+            item()
+        self._append_log(lines)
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
+        
+    def _append_log(self, lines):
+        if lines:
+            text = "\n".join(lines)
+            if self._log_file:
+                self._log_file.write(text + "\n")
+                self._log_file.flush()
+            self.log_text.insert(tk.END, *text.split("\n"))
+            # Keep the widget to the newest LOG_MAX_LINES lines
+            excess = self.log_text.size() - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete(0, excess - 1)
+            self.log_text.see(tk.END)
         
     def run(self):
         """Run the installer"""
         self.root.mainloop()
 
 if __name__ == "__main__":
-    if os.geteuid() != 0:
-        print("This installer must be run with sudo")
-        sys.exit(1)
-        
     installer = SmartInstallerRPi5()
     installer.run()
\ No newline at end of file
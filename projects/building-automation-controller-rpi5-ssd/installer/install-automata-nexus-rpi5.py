@@ -5,17 +5,69 @@ Optimized for RPi5 with NVMe SSD on Bookworm 64-bit
 """
 
 import os
+import re
 import sys
+import select
 import subprocess
 import time
 import shutil
 import json
+import tempfile
+import urllib.request
 from pathlib import Path
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime
 import threading
-from PIL import Image, ImageTk
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Components run concurrently once their dependencies are done
+COMPONENT_WORKERS = 4
+
+# Queued log lines are written to the GUI this often
+LOG_FLUSH_MS = 50
+
+# Command output is drained in chunks of this size
+READ_CHUNK = 1 << 16
+
+# io_uring is stable enough for the backend's disk path from this kernel on
+IO_URING_MIN_KERNEL = (5, 9)
+
+# Header logo, shipped pre-scaled next to the full-size original
+LOGO_SIZE = (250, 80)
+LOGO_FILE = "automata-nexus-logo-250x80.png"
+
+def scaled_logo(src):
+    """Resize the full logo to LOGO_SIZE once and return the cached copy
+    
+    The cache file is keyed by the source mtime and size, so an updated
+    logo is picked up.
+    """
+    st = os.stat(src)
+    cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                             "automata-nexus")
+    cached = os.path.join(cache_dir, f"logo-250x80-{int(st.st_mtime)}-{st.st_size}.png")
+    if not os.path.exists(cached):
+        from PIL import Image
+        os.makedirs(cache_dir, exist_ok=True)
+        Image.open(src).resize(LOGO_SIZE, Image.Resampling.LANCZOS).save(cached, optimize=True)
+    return cached
+
+# SSD mount options per filesystem; discard=async is btrfs-only, ext4 gets
+# its TRIM batched by fstrim.timer instead
+SSD_MOUNT_OPTIONS = {
+    "ext4": ["noatime", "commit=60", "errors=remount-ro"],
+    "btrfs": ["noatime", "commit=60", "discard=async"],
+}
+ATIME_OPTIONS = {"atime", "relatime", "strictatime"}
+
+# Build output and VCS data the application copy leaves behind
+APP_COPY_IGNORE = shutil.ignore_patterns('node_modules', 'target', '.git', '__pycache__')
+
+def import_tk():
+    """Import Tkinter, deferred until the GUI is needed so --help skips it"""
+    global tk, ttk, messagebox, scrolledtext
+    import tkinter as tk
+    from tkinter import ttk, messagebox, scrolledtext
 
 class AutomataNexusRPi5Installer:
     def __init__(self):
@@ -29,33 +81,55 @@ class AutomataNexusRPi5Installer:
         # Installation paths - optimized for SSD
         self.ssd_path = "/mnt/ssd"
         self.install_path = f"{self.ssd_path}/automata-nexus"
-        self.data_path = f"{self.ssd_path}/automata-nexus/data"
+        self.data_path = f"{self.install_path}/data"
         self.metrics_path = f"{self.ssd_path}/metrics"
-        self.cache_path = f"{self.ssd_path}/automata-nexus/cache"
+        self.cache_path = f"{self.install_path}/cache"
+        self.app_path = f"{self.install_path}/app"
+        self.logs_path = f"{self.install_path}/logs"
+        self.backups_path = f"{self.install_path}/backups"
+        self.venv_path = f"{self.install_path}/venv"
+        self.db_path = f"{self.data_path}/metrics.db"
+        self.pip_cache = f"{self.cache_path}/pip"
+        self.npm_cache = f"{self.cache_path}/npm"
+        self.sccache_path = f"{self.cache_path}/sccache"
+        self.cargo_target_path = f"{self.cache_path}/cargo-target"
         self.service_name = "automata-nexus"
         
-        # Component list with RPi5 optimizations
-        self.components = [
-            ("System Optimization", self.optimize_rpi5_system),
-            ("SSD Setup", self.setup_ssd),
-            ("Performance Tuning", self.tune_performance),
-            ("System Update", self.update_system),
-            ("I2C & GPIO Setup", self.enable_hardware),
-            ("Python 3.11+", self.install_python),
-            ("Node.js 20+", self.install_nodejs),
-            ("Rust 1.75+", self.install_rust),
-            ("System Dependencies", self.install_system_deps),
-            ("Python Libraries", self.install_python_libs),
-            ("Sequent Libraries", self.install_sequent_libs),
-            ("Database Setup", self.setup_databases),
-            ("Control Center Application", self.install_application),
-            ("Service Configuration", self.install_service),
-            ("Performance Monitoring", self.setup_monitoring),
-            ("Automated Backups", self.setup_backups),
-        ]
+        # Component graph with RPi5 optimizations: name -> (step, names it
+        # depends on). The package steps only queue their apt packages, which
+        # "Package Installation" then installs in a single apt-get run. The
+        # system tuning steps stay a chain: they share config.txt, fstab and
+        # sysctl, and raspi-config rewrites config.txt as well
+        self.components = {
+            "System Optimization": (self.optimize_rpi5_system, []),
+            "SSD Setup": (self.setup_ssd, ["System Optimization"]),
+            "Performance Tuning": (self.tune_performance, ["SSD Setup"]),
+            "System Update": (self.update_system, []),
+            "I2C & GPIO Setup": (self.enable_hardware, ["Performance Tuning"]),
+            "Python 3.11+": (self.install_python, []),
+            "Node.js 20+": (self.install_nodejs, ["System Update"]),
+            "Rust 1.75+": (self.install_rust, []),
+            "Rust Tools": (self.install_cargo_tools, ["Rust 1.75+", "Package Installation"]),
+            "System Dependencies": (self.install_system_deps, []),
+            "Package Installation": (self.flush_apt,
+                                     ["System Update", "Python 3.11+", "Node.js 20+",
+                                      "System Dependencies"]),
+            "Python Libraries": (self.install_python_libs,
+                                 ["SSD Setup", "Package Installation"]),
+            "Sequent Libraries": (self.install_sequent_libs, ["Python Libraries"]),
+            "Database Setup": (self.setup_databases, ["SSD Setup"]),
+            "Control Center Application": (self.install_application,
+                                           ["SSD Setup", "Rust Tools", "Package Installation"]),
+            "Service Configuration": (self.install_service, ["Control Center Application"]),
+            "Performance Monitoring": (self.setup_monitoring, ["SSD Setup"]),
+            "Automated Backups": (self.setup_backups, ["SSD Setup"]),
+        }
         
         self.current_step = 0
         self.log_file = None
+        self._apt_packages = []
+        self._log_lock = threading.Lock()
+        self._log_queue = queue.Queue()
         self.setup_gui()
         
     def check_hardware(self):
@@ -75,6 +149,10 @@ class AutomataNexusRPi5Installer:
             arch = subprocess.check_output(['uname', '-m']).decode().strip()
             if arch != 'aarch64':
                 raise Exception("This installer requires 64-bit Raspberry Pi OS")
+            
+            # io_uring support; older kernels keep the epoll path
+            version = re.match(r"(\d+)\.(\d+)", os.uname().release)
+            self.io_uring = bool(version) and tuple(map(int, version.groups())) >= IO_URING_MIN_KERNEL
                 
         except Exception as e:
             messagebox.showerror("Hardware Check Failed", str(e))
@@ -87,22 +165,23 @@ class AutomataNexusRPi5Installer:
         header_frame.pack(fill=tk.X)
         header_frame.pack_propagate(False)
         
-        # Try to load logo
-        try:
-            logo_path = os.path.join(os.path.dirname(__file__), "..", "public", "automata-nexus-logo.png")
-            if os.path.exists(logo_path):
-                img = Image.open(logo_path)
-                img = img.resize((250, 80), Image.Resampling.LANCZOS)
-                self.logo = ImageTk.PhotoImage(img)
-                logo_label = tk.Label(header_frame, image=self.logo, bg="#1a1a1a")
-                logo_label.pack(pady=10)
-        except:
-            # Fallback to text
-            title_label = tk.Label(header_frame, 
-                                 text="Automata Nexus Control Center",
-                                 font=("Arial", 20, "bold"),
-                                 fg="white", bg="#1a1a1a")
-            title_label.pack(pady=25)
+        # Title text, replaced by the logo once it is loaded
+        self.title_label = tk.Label(header_frame, 
+                                    text="Automata Nexus Control Center",
+                                    font=("Arial", 20, "bold"),
+                                    fg="white", bg="#1a1a1a")
+        self.title_label.pack(pady=25)
+        
+        # Load the pre-scaled logo directly; only a missing one is resized,
+        # off the Tk thread so the window appears right away
+        public_dir = os.path.join(os.path.dirname(__file__), "..", "public")
+        logo_path = os.path.join(public_dir, LOGO_FILE)
+        if os.path.exists(logo_path):
+            self.show_logo(logo_path)
+        else:
+            full_logo = os.path.join(public_dir, "automata-nexus-logo.png")
+            if os.path.exists(full_logo):
+                threading.Thread(target=self.load_logo, args=(full_logo,), daemon=True).start()
         
         subtitle_label = tk.Label(header_frame,
                                 text="Raspberry Pi 5 SSD Edition",
@@ -176,20 +255,55 @@ class AutomataNexusRPi5Installer:
                                     fg="#666666")
         self.metrics_label.pack(pady=5)
         
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+        
+    def load_logo(self, src):
+        """Scale the full-size logo in the background, then show it"""
+        try:
+            cached = scaled_logo(src)
+        except Exception:
+            return
+        self._ui(self.show_logo, cached)
+        
+    def show_logo(self, path):
+        """Replace the title text with the logo image"""
+        try:
+            self.logo = tk.PhotoImage(file=path)
+        except tk.TclError:
+            return
+        self.title_label.config(image=self.logo)
+        self.title_label.pack_configure(pady=10)
+        
     def log(self, message):
         """Log message to GUI and file"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {message}\n"
         
-        # GUI logging
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
-        self.root.update()
+        # GUI logging, batched by flush_log
+        self._log_queue.put(log_entry)
         
-        # File logging
-        if self.log_file:
-            self.log_file.write(log_entry)
-            self.log_file.flush()
+        # File logging; components log from several threads at once
+        with self._log_lock:
+            if self.log_file:
+                self.log_file.write(log_entry)
+                self.log_file.flush()
+    
+    def _ui(self, fn, *args, **kwargs):
+        """Run a widget call on the Tk thread; Tk must not be touched from workers"""
+        self.root.after(0, lambda: fn(*args, **kwargs))
+        
+    def flush_log(self):
+        """Write queued log lines to the GUI in one insert"""
+        entries = []
+        while True:
+            try:
+                entries.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if entries:
+            self.log_text.insert(tk.END, "".join(entries))
+            self.log_text.see(tk.END)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
     
     def start_installation(self):
         """Start the installation process"""
@@ -214,25 +328,13 @@ class AutomataNexusRPi5Installer:
             if os.geteuid() != 0:
                 raise Exception("This installer must be run with sudo")
             
-            # Run each component
-            for i, (name, func) in enumerate(self.components):
-                self.current_step = i
-                self.progress_label.config(text=f"Installing {name}...")
-                self.current_component_label.config(text=f"Current Component: {name}")
-                self.progress_bar['value'] = i
-                self.root.update()
-                
-                try:
-                    func()
-                    self.log(f"✓ {name} completed successfully")
-                except Exception as e:
-                    self.log(f"✗ {name} failed: {str(e)}")
-                    raise
+            # Run the components, independent ones side by side
+            self.run_components()
             
             # Installation complete
-            self.progress_bar['value'] = len(self.components)
-            self.progress_label.config(text="Installation Complete!")
-            self.current_component_label.config(text="")
+            self._ui(self.progress_bar.config, value=len(self.components))
+            self._ui(self.progress_label.config, text="Installation Complete!")
+            self._ui(self.current_component_label.config, text="")
             self.log("\n✓ Installation completed successfully!")
             
             # Show completion dialog
@@ -240,52 +342,123 @@ class AutomataNexusRPi5Installer:
             
         except Exception as e:
             self.log(f"\n✗ Installation failed: {str(e)}")
-            messagebox.showerror("Installation Failed", str(e))
+            self._ui(messagebox.showerror, "Installation Failed", str(e))
         finally:
             if self.log_file:
                 self.log_file.close()
     
-    def run_command(self, cmd, cwd=None):
-        """Run shell command with optimized settings for RPi5"""
-        if isinstance(cmd, list):
-            cmd_str = " ".join(cmd)
-        else:
-            cmd_str = cmd
+    def run_components(self):
+        """Run every component once its dependencies have completed
+
+        Up to COMPONENT_WORKERS components run at a time. After a failure
+        nothing new is started; the components already running finish and
+        the failure is raised.
+        """
+        pending = dict(self.components)
+        running = {}
+        done = set()
+        
+        with ThreadPoolExecutor(max_workers=COMPONENT_WORKERS) as executor:
+            while pending or running:
+                for name, (func, deps) in list(pending.items()):
+                    if done.issuperset(deps):
+                        del pending[name]
+                        running[executor.submit(self.run_component, name, func)] = name
+                        
+                if not running:
+                    raise Exception(f"Unsatisfiable component dependencies: {', '.join(pending)}")
+                    
+                names = ", ".join(running.values())
+                self._ui(self.progress_label.config, text=f"Installing {names}...")
+                self._ui(self.current_component_label.config, text=f"Current Component: {names}")
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    future.result()
+                    done.add(name)
+                    
+                self.current_step = len(done)
+                self._ui(self.progress_bar.config, value=len(done))
+                
+    def run_component(self, name, func):
+        """Run one component and log its outcome"""
+        try:
+            func()
+            self.log(f"✓ {name} completed successfully")
+        except Exception as e:
+            self.log(f"✗ {name} failed: {str(e)}")
+            raise
             
+    def run_command(self, cmd, cwd=None, env=None):
+        """Run a command (argv list, no shell) with optimized settings for RPi5"""
+        cmd_str = " ".join(cmd)
         self.log(f"Running: {cmd_str}")
         
         # For build commands, use optimized settings
-        if "cargo build" in cmd_str:
+        if os.path.basename(cmd[0]) == "cargo" and "build" in cmd:
             # Add RPi5 optimizations
-            env = os.environ.copy()
+            env = dict(env or os.environ)
             env['CARGO_BUILD_JOBS'] = '4'  # Use all 4 cores
             env['RUSTFLAGS'] = '-C target-cpu=cortex-a76 -C opt-level=3'
             
-            process = subprocess.Popen(cmd_str, shell=True, cwd=cwd, 
-                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                     text=True, bufsize=1, env=env)
-        else:
-            process = subprocess.Popen(cmd_str, shell=True, cwd=cwd, 
-                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                     text=True, bufsize=1)
+        process = subprocess.Popen(cmd, cwd=cwd, env=env, bufsize=0,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        
+        # Drain output in large chunks; only split lines for the log filter
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
         
         output = []
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                line = line.rstrip()
-                output.append(line)
-                if "Compiling" in line or "Building" in line or "Finished" in line:
-                    self.log(f"  {line}")
-                elif "warning:" in line:
-                    self.log(f"⚠ {line}")
+        pending = b""
+        while True:
+            poller.poll()
+            try:
+                chunk = os.read(fd, READ_CHUNK)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                break
+            output.append(chunk)
+            
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                self.log_build_line(line)
+        if pending:
+            self.log_build_line(pending)
         
+        process.stdout.close()
         process.wait()
         
         if process.returncode != 0:
             raise Exception(f"Command failed with exit code {process.returncode}")
             
-        return '\n'.join(output)
+        return b"".join(output).decode(errors="replace").rstrip("\n")
     
+    def run_script(self, url, *args):
+        """Download an install script completely, then run it with bash
+        
+        Unlike piping curl into bash, a truncated download never gets
+        partially executed and a failed fetch is reported as such.
+        """
+        self.log(f"Downloading {url}")
+        tmp = tempfile.NamedTemporaryFile(suffix=".sh", delete=False)
+        try:
+            with tmp, urllib.request.urlopen(url, timeout=60) as response:
+                shutil.copyfileobj(response, tmp)
+            self.run_command(["bash", tmp.name, *args])
+        finally:
+            os.unlink(tmp.name)
+            
+    def log_build_line(self, line):
+        """Log a line of command output if it reports build progress"""
+        if b"Compiling" in line or b"Building" in line or b"Finished" in line:
+            self.log(f"  {line.decode(errors='replace').rstrip()}")
+        elif b"warning:" in line:
+            self.log(f"⚠ {line.decode(errors='replace').rstrip()}")
+            
     def optimize_rpi5_system(self):
         """RPi5-specific system optimizations"""
         self.log("Applying Raspberry Pi 5 optimizations...")
@@ -303,13 +476,30 @@ class AutomataNexusRPi5Installer:
                     f.write("dtparam=pciex1\n")
                     f.write("dtparam=pciex1_gen=3\n")  # Gen3 speeds
         
-        # Set performance governor
+        # Set performance governor; all four RPi5 cores share one cpufreq
+        # policy, so this is a single write rather than one per core
         self.log("Setting performance CPU governor...")
-        for cpu in range(4):  # RPi5 has 4 cores
-            gov_path = f"/sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_governor"
-            if os.path.exists(gov_path):
-                with open(gov_path, 'w') as f:
-                    f.write("performance")
+        for policy in Path("/sys/devices/system/cpu/cpufreq").glob("policy*"):
+            (policy / "scaling_governor").write_text("performance")
+            epp = policy / "energy_performance_preference"
+            if epp.exists():
+                epp.write_text("performance")
+        
+        # Keep it across reboots (cpupower comes with the system deps)
+        governor_service = """[Unit]
+Description=Automata Nexus performance CPU governor
+After=multi-user.target
+
+[Service]
+Type=oneshot
+ExecStart=/usr/bin/cpupower -c all frequency-set -g performance
+RemainAfterExit=yes
+
+[Install]
+WantedBy=multi-user.target
+"""
+        Path("/etc/systemd/system/automata-cpu-governor.service").write_text(governor_service)
+        self.run_command(["systemctl", "enable", "automata-cpu-governor"])
         
         # Optimize kernel parameters
         sysctl_conf = """
@@ -324,8 +514,7 @@ net.ipv4.tcp_rmem=4096 87380 134217728
 net.ipv4.tcp_wmem=4096 65536 134217728
 fs.file-max=2097152
 """
-        with open("/etc/sysctl.d/99-automata-nexus.conf", "w") as f:
-            f.write(sysctl_conf)
+        Path("/etc/sysctl.d/99-automata-nexus.conf").write_text(sysctl_conf)
         
         self.run_command(["sysctl", "-p", "/etc/sysctl.d/99-automata-nexus.conf"])
     
@@ -343,8 +532,10 @@ fs.file-max=2097152
             self.data_path,
             self.metrics_path,
             self.cache_path,
-            f"{self.install_path}/logs",
-            f"{self.install_path}/backups"
+            self.logs_path,
+            self.backups_path,
+            self.pip_cache,
+            self.npm_cache,
         ]
         
         for dir_path in dirs:
@@ -353,9 +544,44 @@ fs.file-max=2097152
         
         # Set optimal mount options if not already set
         self.log("Checking SSD mount options...")
-        mount_output = subprocess.check_output(["mount"]).decode()
-        if self.ssd_path in mount_output and "noatime" not in mount_output:
-            self.log("⚠ Consider adding 'noatime' mount option for better SSD performance")
+        self.tune_mount_options()
+        
+    def tune_mount_options(self):
+        """Add noatime and delayed commit options to the SSD's fstab entry"""
+        lines = Path("/etc/fstab").read_text().splitlines(keepends=True)
+        
+        for i, line in enumerate(lines):
+            fields = line.split()
+            if len(fields) < 4 or fields[0].startswith("#") or fields[1] != self.ssd_path:
+                continue
+                
+            fstype = fields[2]
+            wanted = SSD_MOUNT_OPTIONS.get(fstype, ["noatime"])
+            options = fields[3].split(",")
+            # Replace conflicting atime settings and differing values of our keys
+            keys = {o.split("=")[0] for o in wanted}
+            merged = [o for o in options
+                      if o not in ATIME_OPTIONS and (o in wanted or o.split("=")[0] not in keys)]
+            merged += [o for o in wanted if o not in merged]
+            if merged == options:
+                self.log("SSD mount options already optimized")
+            else:
+                fields[3] = ",".join(merged)
+                lines[i] = "\t".join(fields) + "\n"
+                
+                backup = f"/etc/fstab.bak-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+                shutil.copy2("/etc/fstab", backup)
+                Path("/etc/fstab").write_text("".join(lines))
+                self.log(f"Updated SSD mount options to {fields[3]} (backup: {backup})")
+                
+                self.run_command(["mount", "-o", "remount", self.ssd_path])
+                
+            # Only btrfs gets discard=async, everything else relies on the timer
+            if fstype != "btrfs":
+                self.run_command(["systemctl", "enable", "--now", "fstrim.timer"])
+            return
+            
+        self.log(f"⚠ No /etc/fstab entry for {self.ssd_path}; add 'noatime' for better SSD performance")
     
     def tune_performance(self):
         """Apply performance tuning for RPi5"""
@@ -369,8 +595,7 @@ fs.file-max=2097152
 * soft nproc 4096
 * hard nproc 4096
 """
-        with open("/etc/security/limits.d/99-automata-nexus.conf", "w") as f:
-            f.write(limits_conf)
+        Path("/etc/security/limits.d/99-automata-nexus.conf").write_text(limits_conf)
         
         # Enable huge pages for better memory performance
         self.run_command(["sysctl", "-w", "vm.nr_hugepages=64"])
@@ -378,8 +603,7 @@ fs.file-max=2097152
         # Set I/O scheduler to mq-deadline for NVMe
         nvme_dev = "/sys/block/nvme0n1/queue/scheduler"
         if os.path.exists(nvme_dev):
-            with open(nvme_dev, 'w') as f:
-                f.write("mq-deadline")
+            Path(nvme_dev).write_text("mq-deadline")
             self.log("Set NVMe I/O scheduler to mq-deadline")
     
     def update_system(self):
@@ -397,46 +621,48 @@ fs.file-max=2097152
         
         # Add i2c modules
         modules = ["i2c-dev", "i2c-bcm2835"]
+        existing = set(Path("/etc/modules").read_text().split())
         with open("/etc/modules", "a") as f:
             for module in modules:
-                if module not in open("/etc/modules").read():
+                if module not in existing:
                     f.write(f"{module}\n")
+                    existing.add(module)
     
     def install_python(self):
         """Install Python 3.11+"""
-        self.log("Installing Python 3.11+...")
+        self.log("Queueing Python 3.11+ packages...")
         packages = [
             "python3.11", "python3.11-dev", "python3.11-venv",
             "python3-pip", "python3-smbus", "python3-serial"
         ]
-        self.run_command(["apt-get", "install", "-y"] + packages)
+        self._apt_packages.extend(packages)
     
     def install_nodejs(self):
         """Install Node.js 20+"""
         self.log("Installing Node.js 20...")
         # Use NodeSource repository for latest version
-        self.run_command(["curl", "-fsSL", "https://deb.nodesource.com/setup_20.x", "|", "bash", "-"])
-        self.run_command(["apt-get", "install", "-y", "nodejs"])
+        self.run_script("https://deb.nodesource.com/setup_20.x")
+        self._apt_packages.append("nodejs")
     
     def install_rust(self):
         """Install Rust with RPi5 optimizations"""
         self.log("Installing Rust toolchain...")
         
         # Install rustup
-        rust_installer = "/tmp/rustup.sh"
-        self.run_command(["curl", "--proto", "=https", "--tlsv1.2", "-sSf", 
-                         "https://sh.rustup.rs", "-o", rust_installer])
-        self.run_command(["sh", rust_installer, "-y"])
+        self.run_script("https://sh.rustup.rs", "-y")
         
         # Add ARM64 target with specific features
         self.run_command(["/root/.cargo/bin/rustup", "target", "add", "aarch64-unknown-linux-gnu"])
-        
-        # Install additional tools
+    
+    def install_cargo_tools(self):
+        """Build the cargo tools, once the C toolchain is installed"""
+        self.log("Installing Rust tools...")
         self.run_command(["/root/.cargo/bin/cargo", "install", "cargo-binutils"])
+        self.run_command(["/root/.cargo/bin/cargo", "install", "sccache", "--locked"])
     
     def install_system_deps(self):
         """Install system dependencies"""
-        self.log("Installing system dependencies...")
+        self.log("Queueing system dependencies...")
         packages = [
             # Build tools
             "build-essential", "gcc", "g++", "make", "cmake", "pkg-config",
@@ -445,21 +671,37 @@ fs.file-max=2097152
             "libayatana-appindicator3-dev", "librsvg2-dev",
             # Hardware tools
             "i2c-tools", "libi2c-dev", "libudev-dev",
+            # Async disk I/O for the backend
+            "liburing-dev",
             # Performance tools
-            "htop", "iotop", "sysstat", "nvme-cli",
+            "htop", "iotop", "sysstat", "nvme-cli", "linux-cpupower",
             # Other utilities
-            "git", "curl", "wget", "jq", "redis-tools",
+            "git", "curl", "wget", "jq", "redis-tools", "zstd",
             # GUI dependencies
             "python3-pil", "python3-pil.imagetk"
         ]
-        self.run_command(["apt-get", "install", "-y"] + packages)
+        self._apt_packages.extend(packages)
+    
+    def flush_apt(self):
+        """Install every queued apt package in one transaction"""
+        packages = list(dict.fromkeys(self._apt_packages))
+        self.log(f"Installing {len(packages)} apt packages...")
+        
+        env = os.environ.copy()
+        env['DEBIAN_FRONTEND'] = 'noninteractive'
+        self.run_command([
+            "apt-get", "install", "-y", "--no-install-recommends",
+            "-o", "Dpkg::Options::=--force-confdef",
+            "-o", "Dpkg::Use-Pty=0",
+        ] + packages, env=env)
+        self._apt_packages.clear()
     
     def install_python_libs(self):
         """Install Python libraries"""
         self.log("Installing Python libraries...")
         
         # Create virtual environment on SSD for better performance
-        venv_path = f"{self.install_path}/venv"
+        venv_path = self.venv_path
         self.run_command(["/usr/bin/python3.11", "-m", "venv", venv_path])
         
         # Upgrade pip
@@ -473,16 +715,17 @@ fs.file-max=2097152
             "prometheus-client", "psutil", "schedule"
         ]
         
-        cache_dir = f"{self.cache_path}/pip"
-        os.makedirs(cache_dir, exist_ok=True)
-        
-        self.run_command([pip_path, "install", "--cache-dir", cache_dir] + packages)
+        # Prefer wheels over source builds; bytecode is compiled once after
+        # the Sequent libraries instead of per package
+        self.run_command([pip_path, "install", "--cache-dir", self.pip_cache,
+                         "--prefer-binary", "--no-compile"] + packages)
     
     def install_sequent_libs(self):
         """Install Sequent Microsystems libraries"""
         self.log("Installing Sequent Microsystems libraries...")
         
-        pip_path = f"{self.install_path}/venv/bin/pip"
+        venv_path = self.venv_path
+        pip_path = f"{venv_path}/bin/pip"
         
         # Install all Sequent libraries
         sequent_libs = [
@@ -492,10 +735,18 @@ fs.file-max=2097152
         
         for lib in sequent_libs:
             try:
-                self.run_command([pip_path, "install", lib])
+                self.run_command([pip_path, "install", "--prefer-binary", "--no-compile", lib])
                 self.log(f"✓ Installed {lib}")
             except:
                 self.log(f"⚠ Could not install {lib}, will need manual installation")
+        
+        # Compile the whole venv in one parallel pass. Like pip's own compile
+        # step this is best-effort: a file that won't byte-compile just runs
+        # from source
+        try:
+            self.run_command([f"{venv_path}/bin/python", "-m", "compileall", "-q", "-j", "4", venv_path])
+        except Exception as e:
+            self.log(f"⚠ Some venv files could not be byte-compiled: {e}")
     
     def setup_databases(self):
         """Setup optimized databases for SSD"""
@@ -503,18 +754,21 @@ fs.file-max=2097152
         
         # Create optimized SQLite configuration
         sqlite_config = f"""-- SQLite optimizations for NVMe SSD
-PRAGMA cache_size = 100000;  -- 100MB cache
-PRAGMA mmap_size = 1073741824;  -- 1GB memory map
-PRAGMA page_size = 4096;  -- Match SSD page size
+-- page_size only applies to a new database (it must run before any table
+-- is created); an existing one keeps its page size until dumped and
+-- reloaded (sqlite3 old.db .dump | sqlite3 new.db)
+PRAGMA page_size = 16384;  -- Fewer, larger writes per flash erase block
 PRAGMA journal_mode = WAL;
 PRAGMA synchronous = NORMAL;
+PRAGMA cache_size = -262144;  -- 256MB cache (negative = KiB)
+PRAGMA mmap_size = 1073741824;  -- 1GB memory map
 PRAGMA temp_store = MEMORY;
-PRAGMA wal_autocheckpoint = 10000;
+PRAGMA wal_autocheckpoint = 4096;  -- Checkpoint every 64MB of WAL
+PRAGMA journal_size_limit = 67108864;  -- Truncate the WAL back to 64MB
 """
         
         config_path = f"{self.data_path}/sqlite-init.sql"
-        with open(config_path, 'w') as f:
-            f.write(sqlite_config)
+        Path(config_path).write_text(sqlite_config)
         
         self.log("Created optimized SQLite configuration")
         
@@ -527,7 +781,7 @@ bind 127.0.0.1
 timeout 0
 tcp-keepalive 300
 loglevel notice
-logfile {self.install_path}/logs/redis.log
+logfile {self.logs_path}/redis.log
 databases 16
 save 900 1
 save 300 10
@@ -542,8 +796,7 @@ maxmemory-policy allkeys-lru
 """
         
         redis_conf_path = f"{self.install_path}/redis.conf"
-        with open(redis_conf_path, 'w') as f:
-            f.write(redis_conf)
+        Path(redis_conf_path).write_text(redis_conf)
         
         self.log("Created Redis configuration for caching")
     
@@ -556,36 +809,35 @@ maxmemory-policy allkeys-lru
         
         # Copy to SSD
         self.log(f"Copying application to SSD...")
-        app_dest = f"{self.install_path}/app"
+        app_dest = self.app_path
         if os.path.exists(app_dest):
             shutil.rmtree(app_dest)
-        shutil.copytree(app_source, app_dest, dirs_exist_ok=True)
+        # Real copies, not hard links: the build rewrites files such as
+        # .cargo/config.toml and Cargo.lock, which must not reach the source
+        shutil.copytree(app_source, app_dest, dirs_exist_ok=True, ignore=APP_COPY_IGNORE)
         
         # Update configuration for SSD paths
         config_updates = {
-            "database_path": f"{self.data_path}/metrics.db",
+            "database_path": self.db_path,
             "cache_path": self.cache_path,
-            "log_path": f"{self.install_path}/logs"
+            "log_path": self.logs_path
         }
         
-        # Build the application
-        os.chdir(app_dest)
+        # Build the application. Commands get an explicit cwd rather than
+        # os.chdir, which would move every other running component too
         
         # Install npm dependencies with SSD cache
-        npm_cache = f"{self.cache_path}/npm"
-        os.makedirs(npm_cache, exist_ok=True)
-        self.run_command(["npm", "config", "set", "cache", npm_cache])
+        self.run_command(["npm", "config", "set", "cache", self.npm_cache], cwd=app_dest)
         
         self.log("Installing Node.js dependencies...")
-        self.run_command(["npm", "install"])
+        self.run_command(["npm", "install"], cwd=app_dest)
         
         self.log("Building Next.js frontend...")
-        self.run_command(["npm", "run", "build"])
+        self.run_command(["npm", "run", "build"], cwd=app_dest)
         
         # Build Rust backend with RPi5 optimizations
         self.log("Building Rust backend with RPi5 optimizations...")
         rust_dir = os.path.join(app_dest, "src-tauri")
-        os.chdir(rust_dir)
         
         # Create optimized Cargo config
         cargo_config = """[build]
@@ -597,27 +849,42 @@ linker = "aarch64-linux-gnu-gcc"
 rustflags = [
     "-C", "target-cpu=cortex-a76",
     "-C", "opt-level=3",
-    "-C", "lto=fat",
-    "-C", "codegen-units=1"
+    "-C", "lto=thin",
+    "-C", "codegen-units=16"
 ]
 
 [profile.release]
 opt-level = 3
-lto = "fat"
-codegen-units = 1
+lto = "thin"
+codegen-units = 16
+split-debuginfo = "unpacked"
 strip = true
 panic = "abort"
 """
         
-        os.makedirs(".cargo", exist_ok=True)
-        with open(".cargo/config.toml", "w") as f:
-            f.write(cargo_config)
+        os.makedirs(f"{rust_dir}/.cargo", exist_ok=True)
+        Path(f"{rust_dir}/.cargo/config.toml").write_text(cargo_config)
+        
+        # Compiler cache and target dir live on the SSD outside app_dest,
+        # which is recreated on every install, so reinstalls reuse them
+        env = os.environ.copy()
+        env['RUSTC_WRAPPER'] = "/root/.cargo/bin/sccache"
+        env['SCCACHE_DIR'] = self.sccache_path
+        env['SCCACHE_CACHE_SIZE'] = "4G"
+        env['CARGO_TARGET_DIR'] = self.cargo_target_path
+        env['CARGO_INCREMENTAL'] = "0"
         
         # Build with optimizations
         self.run_command([
             "/root/.cargo/bin/cargo", "build", "--release",
             "--target", "aarch64-unknown-linux-gnu"
-        ])
+        ], cwd=rust_dir, env=env)
+        
+        # Put the binary where the service expects it
+        release_dir = f"{rust_dir}/target/aarch64-unknown-linux-gnu/release"
+        os.makedirs(release_dir, exist_ok=True)
+        shutil.copy2(f"{self.cargo_target_path}/aarch64-unknown-linux-gnu/release/building-automation-controller",
+                     release_dir)
         
         # Update performance metrics
         self.update_metrics("Build completed")
@@ -626,6 +893,11 @@ panic = "abort"
         """Install optimized systemd service"""
         self.log("Installing systemd service...")
         
+        # io_uring rings are locked in memory
+        io_uring_settings = ""
+        if self.io_uring:
+            io_uring_settings = 'Environment="AUTOMATA_USE_IOURING=1"\nLimitMEMLOCK=infinity\n'
+        
         service_content = f"""[Unit]
 Description=Automata Nexus Automation Control Center (RPi5 SSD)
 After=network.target redis.service
@@ -634,43 +906,46 @@ After=network.target redis.service
 Type=simple
 User=Automata
 Group=Automata
-WorkingDirectory={self.install_path}/app
+WorkingDirectory={self.app_path}
 Environment="NODE_ENV=production"
-Environment="DATABASE_PATH={self.data_path}/metrics.db"
+Environment="DATABASE_PATH={self.db_path}"
 Environment="CACHE_PATH={self.cache_path}"
 Environment="RUST_LOG=info"
+{io_uring_settings}
+# Performance optimizations; core 0 is left to the kernel and the NVMe
+# completion work, which SCHED_FIFO used to starve
+CPUSchedulingPolicy=batch
+Nice=-5
+CPUAffinity=1-3
+IOWeight=1000
 
-# Performance optimizations
-CPUSchedulingPolicy=fifo
-CPUSchedulingPriority=50
-IOSchedulingClass=realtime
-IOSchedulingPriority=0
-Nice=-10
-
-# Memory settings
+# Memory and resource settings
 MemoryMax=4G
 MemoryHigh=3G
+TasksMax=4096
+LimitNOFILE=65536
 
 # Security
 PrivateTmp=true
 NoNewPrivileges=true
+ProtectSystem=strict
+ReadWritePaths={self.install_path} {self.data_path} {self.metrics_path} {self.cache_path}
 
 ExecStartPre=/bin/sleep 5
-ExecStart={self.install_path}/app/src-tauri/target/aarch64-unknown-linux-gnu/release/building-automation-controller
+ExecStart={self.app_path}/src-tauri/target/aarch64-unknown-linux-gnu/release/building-automation-controller
 Restart=always
 RestartSec=10
 
 # Logging
-StandardOutput=append:{self.install_path}/logs/automata-nexus.log
-StandardError=append:{self.install_path}/logs/automata-nexus-error.log
+StandardOutput=append:{self.logs_path}/automata-nexus.log
+StandardError=append:{self.logs_path}/automata-nexus-error.log
 
 [Install]
 WantedBy=multi-user.target
 """
         
         service_path = f"/etc/systemd/system/{self.service_name}.service"
-        with open(service_path, 'w') as f:
-            f.write(service_content)
+        Path(service_path).write_text(service_content)
         
         # Enable service
         self.run_command(["systemctl", "daemon-reload"])
@@ -686,35 +961,22 @@ WantedBy=multi-user.target
         monitor_script = f"""#!/bin/bash
 # Automata Nexus Performance Monitor
 
-LOG_DIR="{self.install_path}/logs/performance"
-mkdir -p "$LOG_DIR"
+LOG_DIR="{self.logs_path}/performance"
+mkdir -p "$LOG_DIR/sa"
 
+# NVMe health, one snapshot a day appended to a single file
 while true; do
-    DATE=$(date +%Y%m%d-%H%M%S)
-    
-    # CPU and Memory
-    top -bn1 | head -20 > "$LOG_DIR/top-$DATE.log"
-    
-    # Disk I/O
-    iostat -x 1 10 > "$LOG_DIR/iostat-$DATE.log"
-    
-    # NVMe health
-    nvme smart-log /dev/nvme0 > "$LOG_DIR/nvme-$DATE.log" 2>/dev/null
-    
-    # Application metrics
-    curl -s http://localhost:1420/api/metrics > "$LOG_DIR/app-metrics-$DATE.json"
-    
-    # Clean old logs (keep 7 days)
-    find "$LOG_DIR" -name "*.log" -mtime +7 -delete
-    find "$LOG_DIR" -name "*.json" -mtime +7 -delete
-    
-    sleep 3600  # Run hourly
-done
+    {{ date; nvme smart-log /dev/nvme0; }} >> "$LOG_DIR/nvme-health.log" 2>/dev/null
+    sleep 86400
+done &
+
+# CPU, memory and disk I/O every 60 s into one binary sysstat file per day
+# (saDD, overwritten in place a month later); read back with sar -f
+exec /usr/lib/sysstat/sadc -F -L -S DISK 60 "$LOG_DIR/sa"
 """
         
         monitor_path = f"{self.install_path}/monitor.sh"
-        with open(monitor_path, 'w') as f:
-            f.write(monitor_script)
+        Path(monitor_path).write_text(monitor_script)
         os.chmod(monitor_path, 0o755)
         
         # Create monitoring service
@@ -732,8 +994,7 @@ User=Automata
 WantedBy=multi-user.target
 """
         
-        with open("/etc/systemd/system/automata-monitor.service", 'w') as f:
-            f.write(monitor_service)
+        Path("/etc/systemd/system/automata-monitor.service").write_text(monitor_service)
         
         self.run_command(["systemctl", "enable", "automata-monitor"])
     
@@ -744,45 +1005,63 @@ WantedBy=multi-user.target
         backup_script = f"""#!/bin/bash
 # Automata Nexus Backup Script
 
-BACKUP_DIR="{self.install_path}/backups"
+BACKUP_DIR="{self.backups_path}"
 DATA_DIR="{self.data_path}"
 RETENTION_DAYS=30
 
 # Create backup
 DATE=$(date +%Y%m%d-%H%M%S)
-BACKUP_FILE="$BACKUP_DIR/backup-$DATE.tar.gz"
+BACKUP_FILE="$BACKUP_DIR/backup-$DATE.tar.zst"
 
-# Stop writes during backup
+# Snapshot Redis; BGSAVE forks and needs no follow-up
 redis-cli BGSAVE
 
-# Create compressed backup
-tar -czf "$BACKUP_FILE" \\
-    -C "$DATA_DIR" . \\
+# Create compressed backup (multi-threaded zstd)
+tar -I 'zstd -T4 --long' -cf "$BACKUP_FILE" \\
+    -C "$DATA_DIR" \\
     --exclude='*.log' \\
-    --exclude='cache/*'
-
-# Resume normal operation
-redis-cli FLUSHDB
+    --exclude='cache/*' \\
+    .
 
 # Upload to cloud (optional)
 # rclone copy "$BACKUP_FILE" remote:automata-backups/
 
 # Clean old backups
-find "$BACKUP_DIR" -name "backup-*.tar.gz" -mtime +$RETENTION_DAYS -delete
+find "$BACKUP_DIR" -name "backup-*.tar.*" -mtime +$RETENTION_DAYS -delete
 
 # Log backup size
 SIZE=$(du -h "$BACKUP_FILE" | cut -f1)
-echo "$(date): Backup completed - $BACKUP_FILE ($SIZE)" >> "{self.install_path}/logs/backup.log"
+echo "$(date): Backup completed - $BACKUP_FILE ($SIZE)" >> "{self.logs_path}/backup.log"
 """
         
         backup_path = f"{self.install_path}/backup.sh"
-        with open(backup_path, 'w') as f:
-            f.write(backup_script)
+        Path(backup_path).write_text(backup_script)
         os.chmod(backup_path, 0o755)
         
-        # Add to crontab (daily at 2 AM)
-        cron_entry = f"0 2 * * * {backup_path}\n"
-        self.run_command([f'echo "{cron_entry}" | crontab -'])
+        # Run daily at 2 AM from a systemd timer; Persistent catches up on a
+        # run missed while the Pi was off
+        backup_service = f"""[Unit]
+Description=Automata Nexus Backup
+
+[Service]
+Type=oneshot
+ExecStart={backup_path}
+"""
+        backup_timer = """[Unit]
+Description=Daily Automata Nexus Backup
+
+[Timer]
+OnCalendar=*-*-* 02:00:00
+Persistent=true
+
+[Install]
+WantedBy=timers.target
+"""
+        Path("/etc/systemd/system/automata-backup.service").write_text(backup_service)
+        Path("/etc/systemd/system/automata-backup.timer").write_text(backup_timer)
+        
+        self.run_command(["systemctl", "daemon-reload"])
+        self.run_command(["systemctl", "enable", "--now", "automata-backup.timer"])
     
     def update_metrics(self, status):
         """Update performance metrics display"""
@@ -805,7 +1084,7 @@ echo "$(date): Backup completed - $BACKUP_FILE ($SIZE)" >> "{self.install_path}/
             else:
                 metrics_text = f"CPU: {cpu_percent}% | RAM: {mem.percent}%"
             
-            self.metrics_label.config(text=metrics_text)
+            self._ui(self.metrics_label.config, text=metrics_text)
         except:
             pass
     
@@ -856,5 +1135,6 @@ if __name__ == "__main__":
         print("\nEnsure your SSD is mounted at /mnt/ssd before running.")
         sys.exit(0)
     
+    import_tk()
     installer = AutomataNexusRPi5Installer()
     installer.run()
\ No newline at end of file
@@ -4,51 +4,225 @@ Unified interface for Sequent Microsystems building automation hardware
 Provides JSON API for all supported boards
 """
 
+import os
 import sys
 import json
+import argparse
+import importlib
 import time
+import socket
+import socketserver
+import struct
+from concurrent.futures import ThreadPoolExecutor, wait
 
-# Import all Sequent Microsystems libraries
+# Sequent Microsystems libraries are imported on first use, so a single
+# command only pays for the board it talks to
+BOARD_LIBS = {
+    # board_type: (module, attribute or None for the module itself)
+    '8relay': ('lib8relind', None),
+    '16relay': ('SM16relind', 'SM16relind'),
+    '16univin': ('lib16univin', 'SM16univin'),
+    '16uout': ('SM16uout.SM16uout', None),
+}
+_megabas = None
+_board_libs = {}
+
+
+def load_megabas():
+    """Import the megabas library on first use"""
+    global _megabas
+    if _megabas is None:
+        try:
+            import megabas
+        except (ImportError, OSError) as e:
+            # OSError: the library is installed but can't open the I2C bus
+            raise ImportError("megabas library not installed") from e
+        _megabas = megabas
+    return _megabas
+
+
+def load_board_lib(board_type, required=True):
+    """Import an expansion board library on first use
+
+    Returns None for a library that isn't installed when required is False.
+    """
+    if board_type not in _board_libs:
+        module_name, attr = BOARD_LIBS[board_type]
+        try:
+            lib = importlib.import_module(module_name)
+            _board_libs[board_type] = getattr(lib, attr) if attr else lib
+        except (ImportError, OSError, AttributeError):
+            # Missing, unable to reach the bus at import, or a different API
+            _board_libs[board_type] = None
+    
+    lib = _board_libs[board_type]
+    if lib is None and required:
+        raise ImportError(f"{board_type} library not installed")
+    return lib
+
+
+# C JSON encoder for the output path (optional)
 try:
-    import megabas
+    import orjson
 except ImportError:
-    print(json.dumps({"error": "megabas library not installed"}))
-    sys.exit(1)
+    orjson = None
 
-# Try to import expansion board libraries
-expansion_libs = {}
+# Raw SMBus access for bulk register reads (optional)
 try:
-    import lib8relind
-    expansion_libs['8relay'] = lib8relind
-except:
-    pass
+    from smbus2 import SMBus, i2c_msg
+except ImportError:
+    SMBus = None
 
-try:
-    import SM16relind
-    expansion_libs['16relay'] = SM16relind.SM16relind
-except:
-    pass
+# MegaBAS register map, mirrors the megabas library
+MEGABAS_I2C_BUS = 1
+MEGABAS_BASE_ADDRESS = 0x48
+MEGABAS_RELAYS = 0           # u8 triac bitmap
+MEGABAS_DRY_CONTACT = 3      # u8 contact bitmap
+MEGABAS_U0_10_OUT_VAL1 = 4   # 4 x u16, mV
+MEGABAS_U0_10_IN_VAL1 = 12   # 8 x u16, mV
+MEGABAS_R_1K_CH1 = 28        # 8 x u16, ohm / 1000
+MEGABAS_R_10K_CH1 = 44       # 8 x u16, ohm / 1000
 
-try:
-    import lib16univin
-    expansion_libs['16univin'] = lib16univin.SM16univin
-except:
-    pass
+# Channel names and bit masks for expanding relay/triac/contact bitmaps,
+# built once rather than per status call
+CH_NAMES = tuple(f"ch{ch}" for ch in range(1, 17))
+CH_BITS = {count: tuple(zip(CH_NAMES, (1 << i for i in range(count)))) for count in (4, 8, 16)}
+
+# Field order of the tuple returned by megabas.rtcGet()
+RTC_FIELDS = ("year", "month", "day", "hour", "minute", "second")
+
+# Valid output channel numbers, checked before touching the bus
+VALID_CHANNELS = {
+    "megabas": frozenset(range(1, 5)),
+    "8relay": frozenset(range(1, 9)),
+    "16relay": frozenset(range(1, 17)),
+    "16uout": frozenset(range(1, 17)),
+}
+
+# Status results keyed by (board_type, stack, flat) as (fetched_at_ms, status),
+# dropped whenever an output on that board is written
+_status_cache = {}
+
+# Firmware versions keyed by (board_type, stack); they can't change while
+# the process runs, so each is read from the board once
+_version_cache = {}
+
+# Expansion board instances keyed by (board_type, stack); constructing one
+# handshakes with the board, so a long-running caller (serve) does it once
+_board_cache = {}
+
+# Unix socket the serve command listens on and the CLI forwards to
+SOCKET_PATH = os.environ.get("MEGABAS_SOCKET", "/run/sequent.sock")
+DAEMON_TIMEOUT = 10  # seconds to wait on the daemon before giving up
+
+def parse_stacks(spec):
+    """Parse a stack level list such as "0-7" or "0,1,3" into a sorted tuple"""
+    stacks = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            low, high = part.split("-", 1)
+            stacks.update(range(int(low), int(high) + 1))
+        elif part:
+            stacks.add(int(part))
+    return tuple(sorted(stack for stack in stacks if 0 <= stack <= 7))
 
-try:
-    import SM16uout.SM16uout as SM16uout
-    expansion_libs['16uout'] = SM16uout
-except:
-    pass
 
+def scan_stacks():
+    """Stack levels the board scan probes, from SEQUENT_STACKS
 
-def get_megabas_status(stack=0):
-    """Get complete status of MegaBAS board"""
+    Narrowing this to the levels actually populated (e.g. SEQUENT_STACKS=0,1)
+    cuts the sweep proportionally. Read on the scan path only, so a bad value
+    can't break the other commands; it falls back to every level.
+    """
+    spec = os.environ.get("SEQUENT_STACKS", "0-7")
     try:
+        return parse_stacks(spec)
+    except ValueError:
+        print(f"Ignoring invalid SEQUENT_STACKS={spec!r}, scanning 0-7", file=sys.stderr)
+        return tuple(range(8))
+
+
+# Board probe sweep tuning; a probe still running after its timeout is
+# treated as no board, so one hung read can't stall the scan
+SCAN_WORKERS = 8
+SCAN_PROBE_TIMEOUT = 0.2  # seconds
+
+# Last scan result, reused by scan_all_boards() when a TTL is requested
+_scan_cache = None
+_scan_fetched_at = 0.0
+
+
+def read_megabas_registers(stack):
+    """Read triacs, contacts, analog outputs and analog inputs in one I2C
+    transaction
+
+    Registers 0 to 59 are contiguous, so a single 60 byte read replaces
+    30 per-channel library calls. Returns the triac and contact bitmaps plus
+    one list per analog quantity, indexed by channel - 1, or None when
+    smbus2 is not available or the bulk read fails; callers fall back to
+    the library.
+    """
+    if SMBus is None:
+        return None
+    
+    address = MEGABAS_BASE_ADDRESS + stack
+    try:
+        with SMBus(MEGABAS_I2C_BUS) as bus:
+            write = i2c_msg.write(address, [MEGABAS_RELAYS])
+            read = i2c_msg.read(address, MEGABAS_R_10K_CH1 + 16)
+            bus.i2c_rdwr(write, read)
+        buf = bytes(read)
+    except OSError:
+        return None
+    
+    outputs = struct.unpack_from('<4H', buf, MEGABAS_U0_10_OUT_VAL1)
+    raw = struct.unpack_from('<24H', buf, MEGABAS_U0_10_IN_VAL1)
+    return {
+        "triacs": buf[MEGABAS_RELAYS],
+        "contacts": buf[MEGABAS_DRY_CONTACT],
+        "outputs": [value / 1000.0 for value in outputs],
+        "voltage": [value / 1000.0 for value in raw[0:8]],
+        "r1k": [value / 1000.0 for value in raw[8:16]],
+        "r10k": [value / 1000.0 for value in raw[16:24]]
+    }
+
+
+def get_board(board_type, stack):
+    """Instance of an expansion board class, constructed on first use"""
+    key = (board_type, stack)
+    board = _board_cache.get(key)
+    if board is None:
+        lib = load_board_lib(board_type)
+        if board_type == '16uout':
+            board = lib()
+            board.stack = stack
+        else:
+            board = lib(stack)
+        _board_cache[key] = board
+    return board
+
+
+def cached_version(board_type, stack, read_version):
+    """Firmware version of a board, calling read_version() only on a miss"""
+    key = (board_type, stack)
+    if key not in _version_cache:
+        _version_cache[key] = read_version()
+    return _version_cache[key]
+
+
+def get_megabas_status(stack=0, flat=False):
+    """Get complete status of MegaBAS board
+
+    With flat=True analog_inputs is reported as one 8 element list per
+    quantity instead of a dict per channel.
+    """
+    try:
+        megabas = load_megabas()
         status = {
             "type": "megabas",
             "stack": stack,
-            "firmware": megabas.getVer(stack),
+            "firmware": cached_version("megabas", stack, lambda: megabas.getVer(stack)),
             "analog_inputs": {},
             "analog_outputs": {},
             "triacs": {},
@@ -58,28 +232,42 @@ def get_megabas_status(stack=0):
             "watchdog": {}
         }
         
-        # Read analog inputs
-        for ch in range(1, 9):
-            status["analog_inputs"][f"ch{ch}"] = {
-                "voltage": megabas.getUIn(stack, ch),
-                "r1k": megabas.getRIn1K(stack, ch),
-                "r10k": megabas.getRIn10K(stack, ch)
+        # Read triacs, contacts and analog I/O, in bulk when possible
+        registers = read_megabas_registers(stack)
+        if registers is None:
+            channels = range(1, 9)
+            registers = {
+                "triacs": megabas.getTriacs(stack),
+                "contacts": megabas.getContact(stack),
+                "outputs": [megabas.getUOut(stack, ch) for ch in range(1, 5)],
+                "voltage": [megabas.getUIn(stack, ch) for ch in channels],
+                "r1k": [megabas.getRIn1K(stack, ch) for ch in channels],
+                "r10k": [megabas.getRIn10K(stack, ch) for ch in channels]
+            }
+        
+        if flat:
+            status["analog_inputs"] = {
+                name: registers[name] for name in ("voltage", "r1k", "r10k")
+            }
+        else:
+            status["analog_inputs"] = {
+                name: {"voltage": voltage, "r1k": r1k, "r10k": r10k}
+                for name, voltage, r1k, r10k in zip(CH_NAMES, registers["voltage"], registers["r1k"], registers["r10k"])
             }
         
-        # Read analog outputs
-        for ch in range(1, 5):
-            status["analog_outputs"][f"ch{ch}"] = megabas.getUOut(stack, ch)
+        # Analog outputs
+        status["analog_outputs"] = dict(zip(CH_NAMES, registers["outputs"]))
         
-        # Read triacs
-        triacs_state = megabas.getTriacs(stack)
-        for ch in range(1, 5):
-            status["triacs"][f"ch{ch}"] = bool(triacs_state & (1 << (ch - 1)))
+        # Triacs
+        triacs_state = registers["triacs"]
+        status["triacs"] = {name: bool(triacs_state & mask) for name, mask in CH_BITS[4]}
         
-        # Read dry contacts
-        contacts_state = megabas.getContact(stack)
-        for ch in range(1, 5):
-            status["contacts"][f"ch{ch}"] = {
-                "state": megabas.getContactCh(stack, ch),
+        # Dry contacts; counters and edge modes are outside the bulk block
+        contacts_state = registers["contacts"]
+        for ch, (name, mask) in enumerate(CH_BITS[4], 1):
+            status["contacts"][name] = {
+                # State comes from the bitmask already read above
+                "state": int(bool(contacts_state & mask)),
                 "counter": megabas.getContactCounter(stack, ch),
                 "edge_mode": megabas.getContactCountEdge(stack, ch)
             }
@@ -93,16 +281,8 @@ def get_megabas_status(stack=0):
         
         # Read RTC
         try:
-            rtc_data = megabas.rtcGet(stack)
-            status["rtc"] = {
-                "year": rtc_data[0],
-                "month": rtc_data[1],
-                "day": rtc_data[2],
-                "hour": rtc_data[3],
-                "minute": rtc_data[4],
-                "second": rtc_data[5]
-            }
-        except:
+            status["rtc"] = dict(zip(RTC_FIELDS, megabas.rtcGet(stack)))
+        except Exception:
             pass
         
         # Read watchdog
@@ -122,18 +302,14 @@ def get_megabas_status(stack=0):
 def get_16relay_status(stack):
     """Get status of 16-relay board"""
     try:
-        board = expansion_libs['16relay'](stack)
-        relays = board.get_all()
+        relays = get_board('16relay', stack).get_all()
         
         status = {
             "type": "16relay",
             "stack": stack,
-            "relays": {}
+            "relays": {name: bool(relays & mask) for name, mask in CH_BITS[16]}
         }
         
-        for i in range(16):
-            status["relays"][f"ch{i+1}"] = bool(relays & (1 << i))
-        
         return status
         
     except Exception as e:
@@ -143,37 +319,59 @@ def get_16relay_status(stack):
 def get_8relay_status(stack):
     """Get status of 8-relay board"""
     try:
-        relays = expansion_libs['8relay'].get_all(stack)
+        relays = load_board_lib('8relay').get_all(stack)
         
         status = {
             "type": "8relay",
             "stack": stack,
-            "relays": {}
+            "relays": {name: bool(relays & mask) for name, mask in CH_BITS[8]}
         }
         
-        for i in range(8):
-            status["relays"][f"ch{i+1}"] = bool(relays & (1 << i))
-        
         return status
         
     except Exception as e:
         return {"error": str(e), "type": "8relay", "stack": stack}
 
 
+def get_relay_status_raw(board_type, stack):
+    """Get a relay board's state as a bitmap plus the number of relays on
+
+    For consumers that decode the bitmap themselves; skips building the
+    per-channel dict.
+    """
+    try:
+        if board_type == "16relay":
+            relays = get_board('16relay', stack).get_all()
+        elif board_type == "8relay":
+            relays = load_board_lib('8relay').get_all(stack)
+        else:
+            return {"error": f"Not a relay board: {board_type}"}
+        
+        return {
+            "type": board_type,
+            "stack": stack,
+            "state": relays,
+            "popcount": relays.bit_count()
+        }
+        
+    except Exception as e:
+        return {"error": str(e), "type": board_type, "stack": stack}
+
+
 def get_16univin_status(stack):
     """Get status of 16 universal input board"""
     try:
-        board = expansion_libs['16univin'](stack)
+        board = get_board('16univin', stack)
         
         status = {
             "type": "16univin",
             "stack": stack,
-            "firmware": board.get_version(),
+            "firmware": cached_version("16univin", stack, board.get_version),
             "inputs": {}
         }
         
-        for ch in range(1, 17):
-            status["inputs"][f"ch{ch}"] = {
+        for ch, name in enumerate(CH_NAMES, 1):
+            status["inputs"][name] = {
                 "voltage": board.get_u_in(ch),
                 "r1k": board.get_r1k_in(ch),
                 "r10k": board.get_r10k_in(ch),
@@ -191,19 +389,18 @@ def get_16univin_status(stack):
 def get_16uout_status(stack):
     """Get status of 16 analog output board"""
     try:
-        board = expansion_libs['16uout']()
-        board.stack = stack
+        board = get_board('16uout', stack)
         
         status = {
             "type": "16uout",
             "stack": stack,
-            "firmware": board.get_version(),
+            "firmware": cached_version("16uout", stack, board.get_version),
             "outputs": {},
             "calibration": board.calib_status()
         }
         
-        for ch in range(1, 17):
-            status["outputs"][f"ch{ch}"] = board.get_u_out(ch)
+        for ch, name in enumerate(CH_NAMES, 1):
+            status["outputs"][name] = board.get_u_out(ch)
         
         return status
         
@@ -211,13 +408,57 @@ def get_16uout_status(stack):
         return {"error": str(e), "type": "16uout", "stack": stack}
 
 
+def get_board_status(board_type, stack, ttl_ms=0, flat=False):
+    """Get the status of any board type
+
+    With ttl_ms > 0 a status younger than ttl_ms milliseconds is served from
+    cache. Writes through this module invalidate the board's entry, so the
+    cache never hides a change made here. Cached results are shared and
+    must not be mutated by callers. flat only applies to the MegaBAS.
+    """
+    key = (board_type, stack, flat)
+    
+    if ttl_ms > 0 and key in _status_cache:
+        fetched_at, status = _status_cache[key]
+        if time.monotonic() * 1000 - fetched_at < ttl_ms:
+            return status
+    
+    if board_type == "megabas":
+        status = get_megabas_status(stack, flat)
+    elif board_type == "16relay":
+        status = get_16relay_status(stack)
+    elif board_type == "8relay":
+        status = get_8relay_status(stack)
+    elif board_type == "16univin":
+        status = get_16univin_status(stack)
+    elif board_type == "16uout":
+        status = get_16uout_status(stack)
+    else:
+        return {"error": f"Unknown board type: {board_type}"}
+    
+    if "error" not in status:
+        _status_cache[key] = (time.monotonic() * 1000, status)
+    return status
+
+
+def invalidate_status(board_type, stack):
+    """Drop cached status for a board after one of its outputs changed"""
+    for flat in (False, True):
+        _status_cache.pop((board_type, stack, flat), None)
+
+
 def set_megabas_output(stack, output_type, channel, value):
     """Set MegaBAS output"""
+    if channel not in VALID_CHANNELS["megabas"]:
+        return {"error": f"Invalid channel: {channel}"}
+    
     try:
+        megabas = load_megabas()
         if output_type == "analog":
             megabas.setUOut(stack, channel, float(value))
         elif output_type == "triac":
             megabas.setTriac(stack, channel, int(value))
+        invalidate_status("megabas", stack)
         return {"success": True}
     except Exception as e:
         return {"error": str(e)}
@@ -225,12 +466,15 @@ def set_megabas_output(stack, output_type, channel, value):
 
 def set_relay(board_type, stack, channel, value):
     """Set relay state"""
+    if channel not in VALID_CHANNELS.get(board_type, ()):
+        return {"error": f"Invalid channel: {channel}"}
+    
     try:
         if board_type == "16relay":
-            board = expansion_libs['16relay'](stack)
-            board.set(channel, int(value))
+            get_board('16relay', stack).set(channel, int(value))
         elif board_type == "8relay":
-            expansion_libs['8relay'].set(stack, channel, int(value))
+            load_board_lib('8relay').set(stack, channel, int(value))
+        invalidate_status(board_type, stack)
         return {"success": True}
     except Exception as e:
         return {"error": str(e)}
@@ -238,114 +482,371 @@ def set_relay(board_type, stack, channel, value):
 
 def set_16uout(stack, channel, value):
     """Set 16 analog output"""
+    if channel not in VALID_CHANNELS["16uout"]:
+        return {"error": f"Invalid channel: {channel}"}
+    
     try:
-        board = expansion_libs['16uout']()
-        board.stack = stack
-        board.set_u_out(channel, float(value))
+        get_board('16uout', stack).set_u_out(channel, float(value))
+        invalidate_status("16uout", stack)
         return {"success": True}
     except Exception as e:
         return {"error": str(e)}
 
 
-def scan_all_boards():
-    """Scan for all connected boards"""
-    boards = []
+def emergency_stop():
+    """Switch off every triac and relay on every stack level
+
+    Shutoffs are written blind rather than scanning first: writes to absent
+    boards fail and are skipped, which keeps probe latency off the stop path.
+    """
+    stopped = []
+    _status_cache.clear()
     
-    # Always check MegaBAS at stack 0
     try:
-        megabas.getVer(0)
-        boards.append({"type": "megabas", "stack": 0})
-    except:
-        pass
+        megabas = load_megabas()
+    except ImportError:
+        megabas = None
+    relay8 = load_board_lib('8relay', required=False)
+    relay16 = load_board_lib('16relay', required=False)
     
-    # Scan other stack levels for expansion boards
-    for stack in range(1, 8):
-        # Try each board type
-        for board_type, lib in expansion_libs.items():
+    for stack in range(8):
+        if megabas is not None:
+            try:
+                if hasattr(megabas, 'setTriacs'):
+                    megabas.setTriacs(stack, 0)
+                else:
+                    for ch in range(1, 5):
+                        megabas.setTriac(stack, ch, 0)
+                stopped.append({"type": "megabas", "stack": stack})
+            except Exception:
+                pass
+        
+        if relay8 is not None:
             try:
-                if board_type == '16relay':
-                    board = lib(stack)
-                    board.get_all()
-                elif board_type == '8relay':
-                    lib.get_all(stack)
-                elif board_type == '16univin':
-                    board = lib(stack)
-                    board.get_version()
-                elif board_type == '16uout':
-                    board = lib()
-                    board.stack = stack
-                    board.get_version()
-                
-                boards.append({"type": board_type, "stack": stack})
-                break  # Found a board at this stack level
-            except:
-                continue
+                relay8.set_all(stack, 0)
+                stopped.append({"type": "8relay", "stack": stack})
+            except Exception:
+                pass
+        
+        if relay16 is not None:
+            try:
+                get_board('16relay', stack).set_all(0)
+                stopped.append({"type": "16relay", "stack": stack})
+            except Exception:
+                pass
     
-    return boards
+    return {"success": True, "stopped": stopped}
 
 
-# Command line interface
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print(json.dumps({"error": "No command specified"}))
-        sys.exit(1)
+def _build_probes():
+    """Resolve each installed board library once into a presence probe
+
+    Probes return the firmware version when the check reads it, else None.
+    """
+    probes = {}
+    
+    try:
+        probes['megabas'] = load_megabas().getVer
+    except ImportError:
+        pass
+    
+    relay8 = load_board_lib('8relay', required=False)
+    relay16 = load_board_lib('16relay', required=False)
+    univin16 = load_board_lib('16univin', required=False)
+    uout16 = load_board_lib('16uout', required=False)
     
-    command = sys.argv[1]
+    if relay8 is not None:
+        def probe_8relay(stack):
+            relay8.get_all(stack)
+        probes['8relay'] = probe_8relay
+    if relay16 is not None:
+        def probe_16relay(stack):
+            get_board('16relay', stack).get_all()
+        probes['16relay'] = probe_16relay
+    if univin16 is not None:
+        def probe_16univin(stack):
+            return get_board('16univin', stack).get_version()
+        probes['16univin'] = probe_16univin
+    if uout16 is not None:
+        def probe_16uout(stack):
+            return get_board('16uout', stack).get_version()
+        probes['16uout'] = probe_16uout
     
+    return probes
+
+
+# Built on the first scan, which is the only path that needs every library
+_probes = None
+
+
+def _probe_one(board_type, stack):
+    """Probe a single board type at a stack level
+
+    Returns (board, version), or None if the board doesn't answer.
+    """
     try:
-        if command == "scan":
-            result = scan_all_boards()
-            print(json.dumps(result))
-        
-        elif command == "status":
-            if len(sys.argv) < 4:
-                print(json.dumps({"error": "Missing board type and stack"}))
-                sys.exit(1)
-            
-            board_type = sys.argv[2]
-            stack = int(sys.argv[3])
-            
-            if board_type == "megabas":
-                result = get_megabas_status(stack)
-            elif board_type == "16relay":
-                result = get_16relay_status(stack)
-            elif board_type == "8relay":
-                result = get_8relay_status(stack)
-            elif board_type == "16univin":
-                result = get_16univin_status(stack)
-            elif board_type == "16uout":
-                result = get_16uout_status(stack)
-            else:
-                result = {"error": f"Unknown board type: {board_type}"}
-            
-            print(json.dumps(result))
-        
-        elif command == "set":
-            if len(sys.argv) < 6:
-                print(json.dumps({"error": "Missing parameters"}))
-                sys.exit(1)
-            
-            board_type = sys.argv[2]
-            stack = int(sys.argv[3])
-            channel = int(sys.argv[4])
-            value = sys.argv[5]
-            
-            if board_type == "megabas-analog":
-                result = set_megabas_output(stack, "analog", channel, value)
-            elif board_type == "megabas-triac":
-                result = set_megabas_output(stack, "triac", channel, value)
-            elif board_type in ["16relay", "8relay"]:
-                result = set_relay(board_type, stack, channel, value)
-            elif board_type == "16uout":
-                result = set_16uout(stack, channel, value)
-            else:
-                result = {"error": f"Unknown board type: {board_type}"}
-            
-            print(json.dumps(result))
+        version = _probes[board_type](stack)
+    except Exception:
+        return None
+    return {"type": board_type, "stack": stack}, version
+
+
+def scan_all_boards(ttl_ms=0):
+    """Scan for all connected boards
+
+    With ttl_ms > 0 a scan younger than ttl_ms milliseconds is returned
+    from cache instead of probing the I2C bus again.
+    """
+    global _scan_cache, _scan_fetched_at, _probes
+    
+    if ttl_ms > 0 and _scan_cache is not None:
+        if time.monotonic() * 1000 - _scan_fetched_at < ttl_ms:
+            # Hand out copies so callers can't mutate the cached entries
+            return [dict(board) for board in _scan_cache]
+    
+    if _probes is None:
+        _probes = _build_probes()
+    
+    # MegaBAS lives at stack 0, expansion boards on the other levels
+    stacks = scan_stacks()
+    probes = [("megabas", 0)] if "megabas" in _probes and 0 in stacks else []
+    probes += [
+        (board_type, stack)
+        for stack in stacks if stack != 0
+        for board_type in BOARD_LIBS if board_type in _probes
+    ]
+    
+    # Probes are independent and spend their time blocked on the bus, so run
+    # them concurrently. Each round of SCAN_WORKERS probes gets one probe
+    # timeout, so queued probes aren't cut short by the ones ahead of them
+    rounds = -(-len(probes) // SCAN_WORKERS)
+    executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS)
+    futures = [executor.submit(_probe_one, board_type, stack) for board_type, stack in probes]
+    _, timed_out = wait(futures, timeout=SCAN_PROBE_TIMEOUT * rounds)
+    # Don't wait on a hung probe; its late result is simply never read
+    executor.shutdown(wait=False, cancel_futures=True)
+    
+    boards = []
+    found_stacks = set()
+    for future in futures:
+        if future in timed_out or future.cancelled() or future.result() is None:
+            continue
+        board, version = future.result()
+        # A live read, so refresh the cache for the status call that usually follows
+        if version is not None:
+            _version_cache[(board["type"], board["stack"])] = version
+        # Keep the first board type found at each stack level
+        if board["stack"] not in found_stacks:
+            found_stacks.add(board["stack"])
+            boards.append(board)
+    
+    # Only a complete sweep is reused; one with timed-out probes is retried
+    if not timed_out:
+        # Stamp after the probe so a slow sweep doesn't shorten the TTL
+        _scan_cache = [dict(board) for board in boards]
+        _scan_fetched_at = time.monotonic() * 1000
+    return boards
+
+
+def dumps_json(obj):
+    """Serialize to compact JSON bytes, via orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def write_json(result):
+    """Write a result to stdout as one line of JSON"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result) + b"\n")
+    else:
+        # Serialize straight into the stream without building the string
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+
+
+class UsageError(Exception):
+    """Command arguments are missing or malformed"""
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """argparse parser that raises UsageError instead of exiting
+
+    Commands are also parsed inside the daemon and batch runs, where a
+    bad request must become an error result rather than end the process.
+    """
+    
+    def error(self, message):
+        raise UsageError(message)
+
+
+def build_parser():
+    """Build the command line parser"""
+    parser = ArgumentParser(prog="megabas_interface.py", add_help=False)
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    scan = commands.add_parser("scan", add_help=False)
+    scan.add_argument("--ttl-ms", type=int, default=0)
+    
+    status = commands.add_parser("status", add_help=False)
+    status.add_argument("board_type")
+    status.add_argument("stack", type=int)
+    status.add_argument("--ttl-ms", type=int, default=0)
+    status.add_argument("--flat", action="store_true")
+    status.add_argument("--raw", action="store_true")
+    
+    set_output = commands.add_parser("set", add_help=False)
+    set_output.add_argument("board_type")
+    set_output.add_argument("stack", type=int)
+    set_output.add_argument("channel", type=int)
+    set_output.add_argument("value")
+    
+    commands.add_parser("emergency_stop", add_help=False)
+    
+    batch = commands.add_parser("batch", add_help=False)
+    batch.add_argument("commands", nargs="?", default="-")
+    
+    serve = commands.add_parser("serve", add_help=False)
+    serve.add_argument("--socket", default=SOCKET_PATH)
+    
+    return parser
+
+
+PARSER = build_parser()
+
+
+def run_command(args):
+    """Run one command given as an argv-style list and return its result"""
+    if not args:
+        raise UsageError("No command specified")
+    
+    opts = PARSER.parse_args(args)
+    command = opts.command
+    
+    if command == "scan":
+        return scan_all_boards(opts.ttl_ms)
+    
+    elif command == "status":
+        if opts.raw:
+            return get_relay_status_raw(opts.board_type, opts.stack)
+        return get_board_status(opts.board_type, opts.stack, opts.ttl_ms, opts.flat)
+    
+    elif command == "set":
+        board_type = opts.board_type
+        stack = opts.stack
+        channel = opts.channel
+        value = opts.value
         
-        else:
-            print(json.dumps({"error": f"Unknown command: {command}"}))
-            
+        if board_type == "megabas-analog":
+            return set_megabas_output(stack, "analog", channel, value)
+        elif board_type == "megabas-triac":
+            return set_megabas_output(stack, "triac", channel, value)
+        elif board_type in ["16relay", "8relay"]:
+            return set_relay(board_type, stack, channel, value)
+        elif board_type == "16uout":
+            return set_16uout(stack, channel, value)
+        return {"error": f"Unknown board type: {board_type}"}
+    
+    elif command == "emergency_stop":
+        return emergency_stop()
+    
+    elif command == "batch":
+        return run_batch(json.loads(opts.commands))
+    
+    raise UsageError(f"{command} can only be run from the command line")
+
+
+def execute(args):
+    """Run a command and return (exit_code, result) as the CLI reports it"""
+    try:
+        return 0, run_command(args)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
-        sys.exit(1)
\ No newline at end of file
+        return 1, {"error": str(e)}
+
+
+def run_batch(commands):
+    """Run a list of argv-style commands in one process, one result each"""
+    if not isinstance(commands, list):
+        raise UsageError("Batch must be a JSON array of commands")
+    
+    results = []
+    for cmd in commands:
+        if not isinstance(cmd, list) or cmd[:1] == ["batch"]:
+            results.append({"error": f"Invalid batch command: {cmd}"})
+            continue
+        results.append(execute([str(arg) for arg in cmd])[1])
+    return results
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Answer line-delimited JSON argv requests on the daemon socket"""
+    
+    def handle(self):
+        for line in self.rfile:
+            try:
+                args = [str(arg) for arg in json.loads(line)]
+                exit_code, result = execute(args)
+            except (ValueError, TypeError) as e:
+                exit_code, result = 1, {"error": f"Bad request: {e}"}
+            
+            reply = dumps_json({"exit_code": exit_code, "result": result})
+            self.wfile.write(reply + b"\n")
+
+
+def serve(socket_path=SOCKET_PATH):
+    """Run as a daemon so libraries and caches stay warm between calls"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    
+    # Bind with the final 0o660 mode so the socket is never world-accessible
+    old_umask = os.umask(0o117)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, DaemonRequestHandler)
+    finally:
+        os.umask(old_umask)
+    
+    with server:
+        server.serve_forever()
+
+
+def call_daemon(args, socket_path=SOCKET_PATH):
+    """Forward a command to a running daemon, None if none is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(DAEMON_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    
+    # Once connected, failures become an error result rather than re-running
+    # the command, which the daemon may already have carried out
+    try:
+        with sock:
+            sock.sendall(dumps_json(args) + b"\n")
+            reply = json.loads(sock.makefile("rb").readline())
+        return reply["exit_code"], reply["result"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return 1, {"error": f"Daemon request failed: {e}"}
+
+
+# Command line interface
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    
+    # batch reads its JSON array of commands from stdin unless given inline
+    if args in (["batch"], ["batch", "-"]):
+        args = ["batch", sys.stdin.read()]
+    
+    if args[:1] == ["serve"]:
+        try:
+            opts = PARSER.parse_args(args)
+        except UsageError as e:
+            write_json({"error": str(e)})
+            sys.exit(1)
+        serve(opts.socket)
+    else:
+        reply = call_daemon(args) if args else None
+        exit_code, result = reply if reply is not None else execute(args)
+        write_json(result)
+        sys.exit(exit_code)
@@ -11,6 +11,8 @@ import shutil
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 class AutomataNexusUninstaller:
     def __init__(self):
@@ -31,7 +33,9 @@ class AutomataNexusUninstaller:
         self.user_data_path = "/var/lib/automata-nexus"
         self.config_path = "/etc/automata-nexus"
         
-        # Components to remove
+        # Components to remove; the first serial_steps run in order, the rest
+        # are independent of each other and run side by side
+        self.serial_steps = 2
         self.components = [
             ("Stop Services", self.stop_services),
             ("Remove Systemd Service", self.remove_service),
@@ -45,6 +49,7 @@ class AutomataNexusUninstaller:
         
         self.current_step = 0
         self.total_steps = len(self.components)
+        self._log_q = queue.Queue()
         
         # Setup UI
         self.setup_ui()
@@ -124,6 +129,9 @@ class AutomataNexusUninstaller:
                  width=15, height=2, bg="#dc2626", fg="white").pack(side=tk.LEFT, padx=10)
     
     def start_uninstall(self):
+        # Tk variables are only read on the GUI thread; the steps use this copy
+        self.preserve_data = self.preserve_data_var.get()
+        
         # Clear content
         for widget in self.content_frame.winfo_children():
             widget.destroy()
@@ -148,6 +156,7 @@ class AutomataNexusUninstaller:
         tk.Label(uninstall_frame, text="Uninstall Log:", font=("Arial", 10), bg="white").pack(anchor=tk.W)
         self.log_text = scrolledtext.ScrolledText(uninstall_frame, height=12, width=80, wrap=tk.WORD)
         self.log_text.pack(pady=(5, 20))
+        self.root.after(50, self._drain_log)
         
         # Start uninstall in thread
         self.uninstall_thread = threading.Thread(target=self.run_uninstall)
@@ -163,23 +172,33 @@ class AutomataNexusUninstaller:
                 
             self.log("Starting Automata Nexus uninstallation...")
             
-            # Run each removal step
-            for i, (name, func) in enumerate(self.components):
-                self.current_step = i + 1
-                self.update_progress(name)
+            # Stop and remove the service first
+            for name, func in self.components[:self.serial_steps]:
+                self.current_step += 1
+                self.update_progress(f"Removing: {name}")
+                self.run_step(name, func)
                 
-                try:
-                    func()
-                    self.log(f"✓ {name} completed")
-                except Exception as e:
-                    self.log(f"⚠ {name} warning: {str(e)}")
-                    # Continue with uninstall even if step fails
+            # Then the independent removal steps concurrently
+            remaining = [name for name, _ in self.components[self.serial_steps:]]
+            self.update_progress(f"Removing: {', '.join(remaining)}")
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = {
+                    executor.submit(self.run_step, name, func): name
+                    for name, func in self.components[self.serial_steps:]
+                }
+                for future in as_completed(futures):
+                    self.current_step += 1
+                    remaining.remove(futures[future])
+                    status = f"Finished: {futures[future]}"
+                    if remaining:
+                        status += f" (still removing: {', '.join(remaining)})"
+                    self.update_progress(status)
                     
             self.log("\n" + "="*50)
             self.log("Uninstallation completed")
             self.log("="*50)
             
-            if self.preserve_data_var.get():
+            if self.preserve_data:
                 self.log(f"\nUser data preserved in: {self.user_data_path}")
                 self.log(f"Configuration preserved in: {self.config_path}")
             
@@ -189,6 +208,15 @@ class AutomataNexusUninstaller:
             self.log(f"\nERROR: Uninstallation failed - {str(e)}")
             self.root.after(0, lambda: messagebox.showerror("Uninstall Failed", str(e)))
             
+    def run_step(self, name, func):
+        """Run one removal step, logging rather than raising on failure"""
+        try:
+            func()
+            self.log(f"✓ {name} completed")
+        except Exception as e:
+            self.log(f"⚠ {name} warning: {str(e)}")
+            # Continue with uninstall even if step fails
+            
     def stop_services(self):
         """Stop running services"""
         self.log("Stopping services...")
@@ -210,25 +238,25 @@ class AutomataNexusUninstaller:
         """Remove application files"""
         self.log("Removing application files...")
         if os.path.exists(self.install_path):
-            shutil.rmtree(self.install_path)
+            self._fast_rmtree(self.install_path)
             self.log(f"Removed: {self.install_path}")
             
     def remove_config(self):
         """Remove configuration files"""
-        if not self.preserve_data_var.get():
+        if not self.preserve_data:
             self.log("Removing configuration files...")
             if os.path.exists(self.config_path):
-                shutil.rmtree(self.config_path)
+                self._fast_rmtree(self.config_path)
                 self.log(f"Removed: {self.config_path}")
         else:
             self.log("Preserving configuration files")
             
     def remove_user_data(self):
         """Remove user data"""
-        if not self.preserve_data_var.get():
+        if not self.preserve_data:
             self.log("Removing user data...")
             if os.path.exists(self.user_data_path):
-                shutil.rmtree(self.user_data_path)
+                self._fast_rmtree(self.user_data_path)
                 self.log(f"Removed: {self.user_data_path}")
         else:
             self.log("Preserving user data")
@@ -237,11 +265,16 @@ class AutomataNexusUninstaller:
         """Remove Python libraries"""
         self.log("Removing Python libraries...")
         libs = ["SMmegabas", "SM16relind", "SM16univin", "SM16uout", "SM8relind"]
-        for lib in libs:
-            try:
-                self.run_command(["pip3", "uninstall", "-y", lib])
-            except:
-                pass
+        try:
+            # One pip run for all of them; pip skips packages that are not installed
+            self.run_command(["pip3", "uninstall", "-y", *libs])
+        except:
+            # Retry one by one so a single failing package doesn't block the rest
+            for lib in libs:
+                try:
+                    self.run_command(["pip3", "uninstall", "-y", lib])
+                except:
+                    pass
                 
     def remove_user(self):
         """Remove automata user"""
@@ -264,25 +297,38 @@ class AutomataNexusUninstaller:
         for path in cleanup_paths:
             if os.path.exists(path):
                 try:
-                    shutil.rmtree(path)
+                    self._fast_rmtree(path)
                 except:
                     pass
                     
+    def _fast_rmtree(self, path):
+        """Delete a directory tree (rm -rf is much faster than shutil.rmtree)"""
+        if os.name != "posix":
+            shutil.rmtree(path)
+            return
+        self.run_command(["rm", "-rf", "--one-file-system", path])
+        
     def update_progress(self, status):
         """Update progress bar and status"""
         progress = (self.current_step / self.total_steps) * 100
         self.root.after(0, lambda: [
-            self.status_label.config(text=f"Removing: {status}"),
+            self.status_label.config(text=status),
             self.progress.config(value=progress)
         ])
         
     def log(self, message):
-        """Add message to log window"""
-        self.root.after(0, lambda: [
-            self.log_text.insert(tk.END, message + "\n"),
-            self.log_text.see(tk.END),
-            self.log_text.update()
-        ])
+        """Queue message for the log window"""
+        self._log_q.put(message)
+        
+    def _drain_log(self):
+        """Write queued log messages to the log window in one insert"""
+        lines = []
+        while not self._log_q.empty():
+            lines.append(self._log_q.get_nowait())
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            self.log_text.see(tk.END)
+        self.root.after(50, self._drain_log)
         
     def run_command(self, cmd):
         """Run shell command"""